@@ -1,195 +1,1205 @@
-# -*- coding: utf-8 -*-
-
-import sys
-import numpy as N
-import ImageHandler as ih
-import MathTools as mt
-
-class AntColonyRacer(object):
-    """Ant Colony Optimisation Engine"""
-
-    def __init__(self):
-        # Toolboxes
-        self.imageHandler = ih.ImageHandler()
-        self.mathTools    = mt.MathTools()
-        # Matrices
-        self.bilateralMatrix = None
-        self.filteredMatrix  = None
-        self.pheromoneMatrix = None
-        self.traceMatrix     = None
-        # Lookups
-        self.directionVectors = []
-        self.directionVectors.append([ 0, 1])
-        self.directionVectors.append([-1, 1])
-        self.directionVectors.append([ 1, 0])
-        self.directionVectors.append([ 1, 1])
-        self.directionIndexes = {}
-        self.directionIndexes[-1] = {-1:3, 0:2, 1:1}
-        self.directionIndexes[ 0] = {-1:0, 0:0, 1:0}
-        self.directionIndexes[ 1] = {-1:1, 0:2, 1:3}
-
-    def generateHeuristicMatrices(self, imageMatrix):
-        """list generateHeuristicMatrices(numpy.array imageMatrix)"""
-
-        # Image Filter
-        filteredMatrix = self.mathTools.bilateralFilter(imageMatrix, 3, 10, 15)
-        self.bilateralMatrix = N.copy(filteredMatrix)
-        filteredMatrix = self.mathTools.medianFilter(filteredMatrix, (1, 15))
-        self.filteredMatrix = filteredMatrix
-
-        # Heuristic Direction Matrices
-        horizontalMatrix = self.mathTools.directionalGradient(filteredMatrix, 0)
-        uDiagonalMatrix  = self.mathTools.directionalGradient(filteredMatrix, 1)
-        verticalMatrix   = self.mathTools.directionalGradient(filteredMatrix, 2)
-        lDiagonalMatrix  = self.mathTools.directionalGradient(filteredMatrix, 3)
-
-        # Scale Brightness
-        horizontalMatrix /= N.max(horizontalMatrix)
-        uDiagonalMatrix  /= N.max(uDiagonalMatrix)
-        verticalMatrix   /= N.max(verticalMatrix)
-        lDiagonalMatrix  /= N.max(lDiagonalMatrix)
-
-        # Heuristic Matrix Container
-        heuristicMatrices = []
-        heuristicMatrices.append(horizontalMatrix)
-        heuristicMatrices.append(uDiagonalMatrix)
-        heuristicMatrices.append(verticalMatrix)
-        heuristicMatrices.append(lDiagonalMatrix)
-
-        # Return Container
-        return heuristicMatrices
-
-    def generateTraceMatrix(self, imageMatrix, parameterSet):
-        """numpy.array generateTraceMatrix(numpy.array imageMatrix, dict parameterSet)"""
-
-        # Parameters
-        cycleCount = parameterSet['cycleCount']
-        rho        = parameterSet['rho']
-        psi        = parameterSet['psi']
-
-        # Heuristic Matrices
-        heuristicMatrices = self.generateHeuristicMatrices(imageMatrix)
-
-        # Pheromone Matrix
-        pheromoneMatrix = self.mathTools.gradient(self.filteredMatrix) + N.ones_like(imageMatrix) * 0.01
-        initialPheromoneMatrix = N.copy(pheromoneMatrix)
-
-        # Trace Matrix
-        self.traceMatrix = N.zeros_like(imageMatrix, dtype = float)
-
-        # Image Dimensions
-        matrixHeight = imageMatrix.shape[0]
-        matrixWidth  = imageMatrix.shape[1]
-        stepCount = matrixWidth - 1
-
-        # Ant Starting Search Space
-        limit = self.imageHandler.getRelevantRegion(imageMatrix)
-        indexes  = list(N.ndindex(matrixHeight, 1))
-        indexes  = indexes[limit[0]: limit[1] + 1]
-        antCount = len(indexes)
-
-        # For Each Cycle
-        for cycle in xrange(cycleCount):
-
-            # Random Ant Distribution
-            N.random.shuffle(indexes)
-            antSet = indexes[0: antCount]
-
-            # For Each Ant
-            for i in xrange(antCount):
-
-                # Default Direction Index
-                previousIndex = 1
-
-                # For Each Step
-                for step in xrange(stepCount):
-
-                    # Current Ant Position
-                    x = antSet[i][0]
-                    y = antSet[i][1]
-
-                    # Pheromone Window
-                    u = self.mathTools.clamp(x - 1, matrixHeight - 1)
-                    v = self.mathTools.clamp(x + 1, matrixHeight - 1)
-                    pheromoneWindow = N.copy(pheromoneMatrix[u: v + 1, y + 1])
-
-                    # Weighted Random Ant Direction
-                    probabilities = pheromoneWindow / N.sum(pheromoneWindow)
-                    destinationIndex = N.random.choice(N.arange(len(probabilities)), p = probabilities)
-
-                    # Update Previous Index
-                    previousIndex = destinationIndex
-
-                    # Compute Movement Delta
-                    dx = destinationIndex - 1
-                    dy = 1
-
-                    # Update Ant Position
-                    newX = self.mathTools.clamp(x + dx, matrixHeight - 1)
-                    newY = self.mathTools.clamp(y + dy, matrixWidth  - 1)
-                    antSet[i] = (newX, newY)
-
-                    # Heuristic Matrix
-                    directionIndex = self.directionIndexes[dx][dy]
-                    heuristicMatrix = heuristicMatrices[directionIndex]
-
-                    # Local Pheromone Update
-                    pheromone = pheromoneMatrix[newX, newY]
-                    heuristic = heuristicMatrix[newX, newY]
-                    pheromoneMatrix[newX, newY] += rho * heuristic
-
-                    # Trace Matrix Update
-                    self.traceMatrix[newX, newY] += 0.01
-
-            # Global Pheromone Update
-            pheromoneMatrix = (1 - psi) * pheromoneMatrix
-
-        # Truncate Matrix Values to [0.,1.]
-        pheromoneMatrix = self.mathTools.normalize(pheromoneMatrix)
-
-        # Store Pheromone Matrix
-        self.pheromoneMatrix = pheromoneMatrix
-
-        # Return Trace Matrix
-        return self.traceMatrix
-        
-    def run(self, imageMatrix, parameterSet):
-        """numpy.array run(numpy.array imageMatrix, dict parameterSet)"""
-
-        # Algorithm - First Pass
-        traceMatrix    = self.generateTraceMatrix(imageMatrix, parameterSet)
-
-        # Algorithm - Second Pass
-        reverseMatrix  = self.generateTraceMatrix(N.fliplr(imageMatrix), parameterSet)
-        traceMatrix   += N.fliplr(reverseMatrix)
-
-        # Adjust Trace Image
-        traceMatrix /= N.max(traceMatrix)
-
-        # Return Trace Matrix
-        return traceMatrix
-
-if __name__ == '__main__':
-    if (len(sys.argv) < 3):
-        print 'python AntColonyRacer.py sourceFile destinationFile'
-    else:
-        # Toolboxes
-        imageHandler = ih.ImageHandler()
-
-        # Load Image Matrix
-        sourceFile  = sys.argv[1]
-        imageMatrix = imageHandler.getGrayscaleMatrix(sourceFile)
-
-        # Fill Parameters
-        parameterSet = {}
-        parameterSet['cycleCount'] = 10
-        parameterSet['rho'] = 1.0
-        parameterSet['psi'] = 0.1
-
-        # Run Algorithm
-        antColonyRacer = AntColonyRacer()
-        traceMatrix = antColonyRacer.run(imageMatrix, parameterSet)
-
-        # Save Image
-        destinationFile = sys.argv[2]
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import shutil
+import tempfile
+import numpy as N
+import os.path as P
+import multiprocessing as mp
+import multiprocessing.pool as mpp
+import ImageHandler as ih
+import MathTools as mt
+import KernelTools as kt
+import ProfileTools as pt
+import LayerTools as lt
+
+class AntColonyRacer(object):
+    """Ant Colony Optimisation Engine"""
+
+    def __init__(self, heuristicCache = None):
+        # Toolboxes
+        self.imageHandler = ih.ImageHandler()
+        self.mathTools    = mt.MathTools()
+        self.kernelTools  = kt.KernelTools()
+        self.layerTools   = lt.LayerTools()
+        # Heuristic Cache
+        self.heuristicCache = heuristicCache
+        # Matrices
+        self.bilateralMatrix = None
+        self.filteredMatrix  = None
+        self.pheromoneMatrix = None
+        self.traceMatrix     = None
+        self.combinedPheromoneMatrix = None
+        # Colony and Pass Reports
+        self.colonyReports = []
+        self.passReports   = []
+        # Lookups
+        self.directionVectors = []
+        self.directionVectors.append([ 0, 1])
+        self.directionVectors.append([-1, 1])
+        self.directionVectors.append([ 1, 0])
+        self.directionVectors.append([ 1, 1])
+        self.directionIndexes = {}
+        self.directionIndexes[-1] = {-1:3, 0:2, 1:1}
+        self.directionIndexes[ 0] = {-1:0, 0:0, 1:0}
+        self.directionIndexes[ 1] = {-1:1, 0:2, 1:3}
+        self.directionLookup = N.array([self.directionIndexes[dx][1] for dx in (-1, 0, 1)])
+
+    def getFilterParameters(self, parameterSet = None):
+        """dict getFilterParameters([dict parameterSet = None])"""
+        filterParameters = {}
+        filterParameters['bilateralIterations'] = 3
+        filterParameters['bilateralDiameter']   = 10
+        filterParameters['bilateralSigma']      = 15
+        filterParameters['medianWidth']         = 15
+        filterParameters['precision']           = 'float64'
+        if (parameterSet is not None):
+            for name in filterParameters:
+                filterParameters[name] = parameterSet.get(name, filterParameters[name])
+        return filterParameters
+
+    def getPrecision(self, filterParameters):
+        """type getPrecision(dict filterParameters)"""
+        precision = filterParameters['precision']
+        if (precision == 'float64'):
+            return N.float64
+        if (precision == 'float32'):
+            return N.float32
+        raise ValueError('Unknown precision: ' + str(precision))
+
+    def filterImage(self, imageMatrix, parameterSet = None):
+        """tuple filterImage(numpy.array imageMatrix[, dict parameterSet = None])"""
+
+        # Filter Parameters
+        filterParameters = self.getFilterParameters(parameterSet)
+        precision = self.getPrecision(filterParameters)
+
+        # Cached Filter Results
+        if (self.heuristicCache is not None):
+            key = self.heuristicCache.getKey(imageMatrix, filterParameters)
+            filterResults = self.heuristicCache.get(key)
+            if (filterResults is not None):
+                return filterResults
+
+        # Unscaled Filter Matrices
+        bilateralMatrix, filteredMatrix, heuristicStack, gradientMatrix = self.filterMatrices(imageMatrix, filterParameters)
+
+        # Scale Brightness
+        heuristicStack /= N.max(heuristicStack, axis = (1, 2))[:, None, None]
+
+        # Heuristic Matrix Container
+        heuristicMatrices = list(heuristicStack)
+
+        # Store Filter Results
+        filterResults = (bilateralMatrix, filteredMatrix, heuristicMatrices, gradientMatrix)
+        if (self.heuristicCache is not None):
+            self.heuristicCache.put(key, filterResults)
+
+        # Return Filter Results
+        return filterResults
+
+    def filterMatrices(self, imageMatrix, filterParameters):
+        """tuple filterMatrices(numpy.array imageMatrix, dict filterParameters)"""
+        precision = self.getPrecision(filterParameters)
+
+        # Image Filter
+        filteredMatrix = self.mathTools.bilateralFilter(imageMatrix,
+                                                        filterParameters['bilateralIterations'],
+                                                        filterParameters['bilateralDiameter'],
+                                                        filterParameters['bilateralSigma']).astype(precision)
+        bilateralMatrix = N.copy(filteredMatrix)
+        filteredMatrix = self.mathTools.medianFilter(filteredMatrix, (1, filterParameters['medianWidth']))
+
+        # Heuristic Direction Matrices and Gradient Magnitude (Fused)
+        heuristicStack, gradientMatrix = self.mathTools.gradientStack(filteredMatrix)
+
+        # Return Unscaled Filter Matrices
+        return bilateralMatrix, filteredMatrix, heuristicStack, gradientMatrix
+
+    def flipFilterResults(self, filterResults):
+        """tuple flipFilterResults(tuple filterResults)"""
+        bilateralMatrix, filteredMatrix, heuristicMatrices, gradientMatrix = filterResults
+
+        # Mirrored Directions Swap the Diagonals
+        flippedMatrices = []
+        for directionIndex in (0, 3, 2, 1):
+            flippedMatrices.append(N.fliplr(heuristicMatrices[directionIndex]))
+
+        # Return Flipped Filter Results
+        return N.fliplr(bilateralMatrix), N.fliplr(filteredMatrix), flippedMatrices, N.fliplr(gradientMatrix)
+
+    def generateHeuristicMatrices(self, imageMatrix, parameterSet = None):
+        """list generateHeuristicMatrices(numpy.array imageMatrix[, dict parameterSet = None])"""
+
+        # Filter Image
+        bilateralMatrix, filteredMatrix, heuristicMatrices, gradientMatrix = self.filterImage(imageMatrix, parameterSet)
+
+        # Store Filtered Matrices
+        self.bilateralMatrix = bilateralMatrix
+        self.filteredMatrix  = filteredMatrix
+
+        # Return Container
+        return heuristicMatrices
+
+    def createSeeds(self, count, parameterSet):
+        """numpy.array createSeeds(int count, dict parameterSet)"""
+
+        # Seed Source
+        if ('seed' in parameterSet):
+            seedSource = N.random.RandomState(parameterSet['seed'])
+        else:
+            seedSource = N.random
+
+        # Independent Seeds
+        return seedSource.randint(2**31 - 1, size = count)
+
+    def createRandomStates(self, count, parameterSet):
+        """list createRandomStates(int count, dict parameterSet)"""
+        return [N.random.RandomState(seed) for seed in self.createSeeds(count, parameterSet)]
+
+    def getAntCount(self, limit, parameterSet):
+        """int getAntCount(numpy.array limit, dict parameterSet)"""
+        regionSize = int(limit[1] - limit[0] + 1)
+        return min(parameterSet.get('antCount', regionSize), regionSize)
+
+    def preparePass(self, imageMatrix, randomState, filterResults, limit = None):
+        """ColonyPass preparePass(numpy.array imageMatrix, numpy.random.RandomState randomState, tuple filterResults[,
+        numpy.array limit = None])"""
+
+        # Colony Pass
+        colonyPass = ColonyPass()
+        colonyPass.randomState = randomState
+
+        # Heuristic Matrices
+        colonyPass.bilateralMatrix   = filterResults[0]
+        colonyPass.filteredMatrix    = filterResults[1]
+        colonyPass.heuristicMatrices = filterResults[2]
+        gradientMatrix = filterResults[3]
+
+        # Pheromone Matrix (Filter Precision)
+        precision = colonyPass.filteredMatrix.dtype.type
+        colonyPass.pheromoneMatrix = gradientMatrix.astype(precision) + precision(0.01)
+
+        # Trace Matrix
+        colonyPass.traceMatrix = self.createTraceMatrix(imageMatrix.shape, precision)
+
+        # Ant Starting Search Space
+        if (limit is None):
+            limit = self.imageHandler.getRelevantRegion(imageMatrix)
+        colonyPass.limit = limit
+
+        # Return Colony Pass
+        return colonyPass
+
+    def createTraceMatrix(self, shape, precision):
+        """numpy.array createTraceMatrix(tuple shape, type precision)"""
+        if (precision == N.float32):
+            return N.zeros(shape, dtype = N.int32)
+        return N.zeros(shape, dtype = float)
+
+    def getTraceIncrement(self, traceMatrix):
+        """number getTraceIncrement(numpy.array traceMatrix)"""
+        if (traceMatrix.dtype.kind == 'i'):
+            return traceMatrix.dtype.type(1)
+        return traceMatrix.dtype.type(0.01)
+
+    def walkPass(self, colonyPass, parameterSet):
+        """ColonyPass walkPass(ColonyPass colonyPass, dict parameterSet)"""
+
+        # Parameters
+        engine  = parameterSet.get('engine', 'vectorized')
+        backend = parameterSet.get('backend', 'numpy')
+        if (backend not in ('numpy', 'numba')):
+            raise ValueError('Unknown colony backend: ' + str(backend))
+
+        # Colony Walk (Compiled Backend Falls Back to NumPy When Unavailable)
+        colonyPass.walkStart = time.time()
+        if (backend == 'numba' and self.kernelTools.isCompiled()):
+            self.walkCompiled(colonyPass, parameterSet)
+        elif (engine == 'reference'):
+            self.walkReference(colonyPass, parameterSet)
+        elif (engine == 'vectorized'):
+            self.walkVectorized(colonyPass, parameterSet)
+        else:
+            raise ValueError('Unknown colony engine: ' + str(engine))
+
+        # Release Convergence State
+        colonyPass.convergenceState = None
+        if (colonyPass.stopReason is None):
+            colonyPass.stopReason = 'cycleCount'
+
+        # Truncate Matrix Values to [0.,1.]
+        colonyPass.pheromoneMatrix = self.mathTools.normalize(colonyPass.pheromoneMatrix)
+
+        # Scale Visit Counter to Trace Units
+        if (colonyPass.traceMatrix.dtype.kind == 'i'):
+            precision = colonyPass.pheromoneMatrix.dtype.type
+            colonyPass.traceMatrix = colonyPass.traceMatrix.astype(precision) * precision(0.01)
+
+        # Return Colony Pass
+        return colonyPass
+
+    def runPass(self, imageMatrix, parameterSet, randomState, filterResults = None):
+        """ColonyPass runPass(numpy.array imageMatrix, dict parameterSet, numpy.random.RandomState randomState[, tuple filterResults = None])"""
+        if (filterResults is None):
+            filterResults = self.filterImage(imageMatrix, parameterSet)
+        colonyPass = self.preparePass(imageMatrix, randomState, filterResults)
+        return self.walkPass(colonyPass, parameterSet)
+
+    def storePass(self, colonyPass):
+        """storePass(ColonyPass colonyPass)"""
+        self.bilateralMatrix = colonyPass.bilateralMatrix
+        self.filteredMatrix  = colonyPass.filteredMatrix
+        self.pheromoneMatrix = colonyPass.pheromoneMatrix
+        self.traceMatrix     = colonyPass.traceMatrix
+
+    def generateTraceMatrix(self, imageMatrix, parameterSet):
+        """numpy.array generateTraceMatrix(numpy.array imageMatrix, dict parameterSet)"""
+
+        # Colony Pass
+        randomState = self.createRandomStates(1, parameterSet)[0]
+        colonyPass  = self.runPass(imageMatrix, parameterSet, randomState)
+
+        # Store Pass Matrices
+        self.storePass(colonyPass)
+
+        # Return Trace Matrix
+        return self.traceMatrix
+
+    def walkReference(self, colonyPass, parameterSet):
+        """walkReference(ColonyPass colonyPass, dict parameterSet)"""
+
+        # Parameters
+        cycleCount = parameterSet['cycleCount']
+        rho        = parameterSet['rho']
+        psi        = parameterSet['psi']
+
+        # Pass Matrices
+        pheromoneMatrix   = colonyPass.pheromoneMatrix
+        heuristicMatrices = colonyPass.heuristicMatrices
+        traceMatrix       = colonyPass.traceMatrix
+        randomState       = colonyPass.randomState
+        limit             = colonyPass.limit
+        traceIncrement    = self.getTraceIncrement(traceMatrix)
+
+        # Image Dimensions
+        matrixHeight = pheromoneMatrix.shape[0]
+        matrixWidth  = pheromoneMatrix.shape[1]
+        stepCount = matrixWidth - 1
+
+        # Ant Starting Search Space
+        indexes  = list(N.ndindex(matrixHeight, 1))
+        indexes  = indexes[limit[0]: limit[1] + 1]
+        antCount = self.getAntCount(limit, parameterSet)
+
+        # For Each Cycle
+        for cycle in xrange(cycleCount):
+            startTime = pt.profiler.start()
+
+            # Random Ant Distribution
+            randomState.shuffle(indexes)
+            antSet = indexes[0: antCount]
+
+            # For Each Ant
+            for i in xrange(antCount):
+
+                # Default Direction Index
+                previousIndex = 1
+
+                # For Each Step
+                for step in xrange(stepCount):
+
+                    # Current Ant Position
+                    x = antSet[i][0]
+                    y = antSet[i][1]
+
+                    # Pheromone Window
+                    u = self.mathTools.clamp(x - 1, matrixHeight - 1)
+                    v = self.mathTools.clamp(x + 1, matrixHeight - 1)
+                    pheromoneWindow = N.copy(pheromoneMatrix[u: v + 1, y + 1])
+
+                    # Weighted Random Ant Direction
+                    probabilities = pheromoneWindow / N.sum(pheromoneWindow)
+                    destinationIndex = randomState.choice(N.arange(len(probabilities)), p = probabilities)
+
+                    # Update Previous Index
+                    previousIndex = destinationIndex
+
+                    # Compute Movement Delta
+                    dx = destinationIndex - 1
+                    dy = 1
+
+                    # Update Ant Position
+                    newX = self.mathTools.clamp(x + dx, matrixHeight - 1)
+                    newY = self.mathTools.clamp(y + dy, matrixWidth  - 1)
+                    antSet[i] = (newX, newY)
+
+                    # Heuristic Matrix
+                    directionIndex = self.directionIndexes[dx][dy]
+                    heuristicMatrix = heuristicMatrices[directionIndex]
+
+                    # Local Pheromone Update
+                    pheromone = pheromoneMatrix[newX, newY]
+                    heuristic = heuristicMatrix[newX, newY]
+                    pheromoneMatrix[newX, newY] += rho * heuristic
+
+                    # Trace Matrix Update
+                    traceMatrix[newX, newY] += traceIncrement
+
+            # Global Pheromone Update
+            pheromoneMatrix = (1 - psi) * pheromoneMatrix
+            pt.profiler.stop('cycle', startTime)
+            pt.profiler.count('antSteps', antCount * stepCount)
+
+            # Early Termination
+            if (self.isConverged(colonyPass, parameterSet)):
+                break
+
+        # Store Pheromone Matrix
+        colonyPass.pheromoneMatrix = pheromoneMatrix
+
+    def walkVectorized(self, colonyPass, parameterSet):
+        """walkVectorized(ColonyPass colonyPass, dict parameterSet)"""
+
+        # Parameters
+        cycleCount = parameterSet['cycleCount']
+        rho        = parameterSet['rho']
+        psi        = parameterSet['psi']
+
+        # Pass Matrices
+        pheromoneMatrix = colonyPass.pheromoneMatrix
+        heuristicStack  = N.array(colonyPass.heuristicMatrices)
+        traceMatrix     = colonyPass.traceMatrix
+        randomState     = colonyPass.randomState
+        limit           = colonyPass.limit
+        traceIncrement  = self.getTraceIncrement(traceMatrix)
+
+        # Image Dimensions
+        matrixWidth = pheromoneMatrix.shape[1]
+        stepCount = matrixWidth - 1
+
+        # Ant Starting Search Space
+        startRows = N.arange(limit[0], limit[1] + 1)
+        antCount  = self.getAntCount(limit, parameterSet)
+
+        # For Each Cycle
+        for cycle in xrange(cycleCount):
+            startTime = pt.profiler.start()
+
+            # Colony Positions (Random Subset for Reduced Colonies)
+            rows = self.getColonyRows(startRows, antCount, randomState)
+
+            # Walk Every Step Column
+            self.walkColumns(pheromoneMatrix, heuristicStack, traceMatrix, rows, 1, randomState, rho, traceIncrement)
+
+            # Global Pheromone Update
+            pheromoneMatrix = (1 - psi) * pheromoneMatrix
+            pt.profiler.stop('cycle', startTime)
+            pt.profiler.count('antSteps', antCount * stepCount)
+
+            # Early Termination
+            if (self.isConverged(colonyPass, parameterSet)):
+                break
+
+        # Store Pheromone Matrix
+        colonyPass.pheromoneMatrix = pheromoneMatrix
+
+    def getColonyRows(self, startRows, antCount, randomState):
+        """numpy.array getColonyRows(numpy.array startRows, int antCount, numpy.random.RandomState randomState)"""
+        if (antCount < len(startRows)):
+            return randomState.permutation(startRows)[0: antCount]
+        return N.copy(startRows)
+
+    def walkColumns(self, pheromoneMatrix, heuristicStack, traceMatrix, rows, firstColumn, randomState, rho, traceIncrement):
+        """numpy.array walkColumns(numpy.array pheromoneMatrix, numpy.array heuristicStack, numpy.array traceMatrix,
+        numpy.array rows, int firstColumn, numpy.random.RandomState randomState, float rho, number traceIncrement)"""
+
+        # Matrix Height and Window Offsets
+        matrixHeight  = pheromoneMatrix.shape[0]
+        antCount      = len(rows)
+        windowOffsets = N.arange(3)
+
+        # For Each Destination Column
+        for column in xrange(firstColumn, pheromoneMatrix.shape[1]):
+
+            # Pheromone Windows
+            lower = N.maximum(rows - 1, 0)
+            upper = N.minimum(rows + 1, matrixHeight - 1)
+            windowRows = N.minimum(lower[:, None] + windowOffsets, matrixHeight - 1)
+            pheromoneWindows = pheromoneMatrix[windowRows, column]
+            pheromoneWindows[windowOffsets > (upper - lower)[:, None]] = 0.
+
+            # Weighted Random Ant Directions (Inverse CDF)
+            cumulative = N.cumsum(pheromoneWindows, axis = 1)
+            draws = randomState.random_sample(antCount) * cumulative[:, -1]
+            destinationIndexes = N.sum(draws[:, None] >= cumulative[:, :2], axis = 1)
+
+            # Update Ant Positions
+            rows = N.clip(rows + destinationIndexes - 1, 0, matrixHeight - 1)
+
+            # Local Pheromone Update
+            directionIndexes = self.directionLookup[destinationIndexes]
+            heuristics = heuristicStack[directionIndexes, rows, column]
+            N.add.at(pheromoneMatrix, (rows, column), rho * heuristics)
+
+            # Trace Matrix Update
+            N.add.at(traceMatrix, (rows, column), traceIncrement)
+
+        # Return Final Ant Rows
+        return rows
+
+    def isAdaptive(self, parameterSet):
+        """bool isAdaptive(dict parameterSet)"""
+        return parameterSet.get('tolerance') is not None or parameterSet.get('deadline') is not None
+
+    def getConvergence(self, colonyPass, parameterSet):
+        """float getConvergence(ColonyPass colonyPass, dict parameterSet)"""
+
+        # Fraction of Selected Layer Pixels that Moved
+        statistic = parameterSet.get('convergence', 'selection')
+        if (statistic == 'selection'):
+            current  = self.imageHandler.selectLayers(colonyPass.traceMatrix, parameterSet.get('layerCount', 8))
+            previous = colonyPass.convergenceState
+            colonyPass.convergenceState = current
+            if (previous is None):
+                return None
+            return float(N.count_nonzero(current != previous)) / (2. * N.count_nonzero(current))
+        if (statistic != 'trace'):
+            raise ValueError('Unknown convergence statistic: ' + str(statistic))
+
+        # Latest Cycle Deposit as a Visit Distribution (No 1/k Shrink of the Accumulated Trace)
+        traceMatrix = colonyPass.traceMatrix.astype(float)
+        previousTrace, previousDeposit = colonyPass.convergenceState or (None, None)
+        deposit = None
+        if (previousTrace is not None):
+            deposit  = traceMatrix - previousTrace
+            deposit /= max(N.sum(deposit), 1e-12)
+        colonyPass.convergenceState = (traceMatrix, deposit)
+        if (previousDeposit is None):
+            return None
+
+        # L1 Change Between Successive Cycle Deposits
+        return float(N.sum(N.abs(deposit - previousDeposit)))
+
+    def isConverged(self, colonyPass, parameterSet):
+        """bool isConverged(ColonyPass colonyPass, dict parameterSet)"""
+        colonyPass.cyclesUsed += 1
+        if (not self.isAdaptive(parameterSet)):
+            return False
+
+        # Wall-Clock Deadline (No Cycle Expected to Overrun is Started)
+        deadline = parameterSet.get('deadline')
+        if (deadline is not None and colonyPass.cyclesUsed < parameterSet['cycleCount']):
+            elapsed = time.time() - colonyPass.walkStart
+            if (elapsed + elapsed / colonyPass.cyclesUsed > deadline):
+                colonyPass.stopReason = 'deadline'
+                return True
+
+        # Convergence Statistic Under Tolerance
+        tolerance = parameterSet.get('tolerance')
+        if (tolerance is None):
+            return False
+        change = self.getConvergence(colonyPass, parameterSet)
+        if (change is None):
+            return False
+        colonyPass.convergence.append(change)
+        if (colonyPass.cyclesUsed >= parameterSet.get('minCycles', 2) and change < tolerance):
+            colonyPass.stopReason = 'converged'
+            return True
+        return False
+
+    def getPassReport(self, colonyPass, name):
+        """dict getPassReport(ColonyPass colonyPass, str name)"""
+        report = {}
+        report['pass']        = name
+        report['cycles']      = colonyPass.cyclesUsed
+        report['stopReason']  = colonyPass.stopReason
+        report['convergence'] = list(colonyPass.convergence)
+        return report
+
+    def walkCompiled(self, colonyPass, parameterSet):
+        """walkCompiled(ColonyPass colonyPass, dict parameterSet)"""
+
+        # Parameters
+        cycleCount = parameterSet['cycleCount']
+        rho        = parameterSet['rho']
+        psi        = parameterSet['psi']
+
+        # Kernel Seed
+        seed = colonyPass.randomState.randint(2**31 - 1)
+
+        # Ant Starting Search Space
+        limit = colonyPass.limit
+        startRows = N.arange(limit[0], limit[1] + 1)
+        antCount  = self.getAntCount(limit, parameterSet)
+
+        # Sequential Compiled Walk (One Kernel Call per Cycle When Adaptive)
+        heuristicStack = N.array(colonyPass.heuristicMatrices)
+        traceIncrement = self.getTraceIncrement(colonyPass.traceMatrix)
+        stepCount = colonyPass.pheromoneMatrix.shape[1] - 1
+        if (not self.isAdaptive(parameterSet)):
+            startTime = pt.profiler.start()
+            self.kernelTools.walkColony(colonyPass.pheromoneMatrix, colonyPass.traceMatrix, heuristicStack,
+                                        startRows, antCount, self.directionLookup, cycleCount, rho, psi, seed,
+                                        traceIncrement)
+            pt.profiler.stop('compiledWalk', startTime)
+            pt.profiler.count('antSteps', cycleCount * antCount * stepCount)
+            colonyPass.cyclesUsed = cycleCount
+            return
+        cycleSeeds = N.random.RandomState(seed).randint(2**31 - 1, size = cycleCount)
+        for cycle in xrange(cycleCount):
+            startTime = pt.profiler.start()
+            self.kernelTools.walkColony(colonyPass.pheromoneMatrix, colonyPass.traceMatrix, heuristicStack,
+                                        startRows, antCount, self.directionLookup, 1, rho, psi, cycleSeeds[cycle],
+                                        traceIncrement)
+            pt.profiler.stop('compiledWalk', startTime)
+            pt.profiler.count('antSteps', antCount * stepCount)
+            if (self.isConverged(colonyPass, parameterSet)):
+                break
+
+    def runPasses(self, imageMatrices, filterResults, parameterSet):
+        """list runPasses(list imageMatrices, list filterResults, dict parameterSet)"""
+
+        # Parameters
+        parallel = parameterSet.get('parallel', None)
+
+        # Independent Pass Generators
+        randomStates = self.createRandomStates(len(imageMatrices), parameterSet)
+        tasks = zip(imageMatrices, [parameterSet] * len(imageMatrices), randomStates, filterResults)
+
+        # Sequential Passes
+        if (parallel is None):
+            return [self.runPass(*task) for task in tasks]
+
+        # Concurrent Passes
+        if (parallel == 'thread'):
+            pool = mpp.ThreadPool(len(tasks))
+        elif (parallel == 'process'):
+            pool = mp.Pool(len(tasks))
+        else:
+            raise ValueError('Unknown parallel mode: ' + str(parallel))
+        try:
+            colonyPasses = pool.map(runColonyPass, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+        # Return Colony Passes
+        return colonyPasses
+
+    def shareMatrix(self, matrix):
+        """tuple shareMatrix(numpy.array matrix)"""
+        sharedArray  = mp.RawArray('c', int(matrix.nbytes))
+        sharedMatrix = (sharedArray, matrix.dtype.str, matrix.shape)
+        viewMatrix(sharedMatrix)[...] = matrix
+        return sharedMatrix
+
+    def shareTemplate(self, colonyPass):
+        """ColonyPass shareTemplate(ColonyPass colonyPass)"""
+        template = ColonyPass()
+        template.heuristicMatrices = self.shareMatrix(N.array(colonyPass.heuristicMatrices))
+        template.pheromoneMatrix   = self.shareMatrix(colonyPass.pheromoneMatrix)
+        template.limit             = colonyPass.limit
+        return template
+
+    def runColonies(self, imageMatrix, parameterSet):
+        """numpy.array runColonies(numpy.array imageMatrix, dict parameterSet)"""
+        global colonyTemplates
+
+        # Drop the Previous Image Pheromone Map
+        self.combinedPheromoneMatrix = None
+
+        # Parameters
+        colonyCount = parameterSet['colonies']
+        parallel    = parameterSet.get('parallel', None)
+        workerCount = parameterSet.get('workers', None)
+
+        # Filter Once, Mirror for the Reverse Direction
+        forwardResults = self.filterImage(imageMatrix, parameterSet)
+        reverseResults = self.flipFilterResults(forwardResults)
+
+        # Shared Pass Inputs (Handed to Pool Workers by the Initializer)
+        forwardTemplate = self.shareTemplate(self.preparePass(imageMatrix, None, forwardResults))
+        reverseTemplate = self.shareTemplate(self.preparePass(N.fliplr(imageMatrix), None, reverseResults))
+        templates = (forwardTemplate, reverseTemplate)
+
+        # Colony Seeds (First Colony Returns Its Passes)
+        seeds = self.createSeeds(colonyCount, parameterSet)
+        tasks = [(parameterSet, seeds[i], i == 0) for i in xrange(colonyCount)]
+
+        # Run Colonies
+        if (parallel == 'process'):
+            pool = mp.Pool(workerCount, initializeColonies, (templates,))
+            try:
+                colonyResults = pool.map(runColony, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            initializeColonies(templates)
+            try:
+                if (parallel is None):
+                    colonyResults = [runColony(task) for task in tasks]
+                elif (parallel == 'thread'):
+                    pool = mpp.ThreadPool(workerCount)
+                    try:
+                        colonyResults = pool.map(runColony, tasks)
+                    finally:
+                        pool.close()
+                        pool.join()
+                else:
+                    raise ValueError('Unknown parallel mode: ' + str(parallel))
+            finally:
+                colonyTemplates = None
+
+        # Colony and Pass Reports
+        self.colonyReports = []
+        self.passReports   = []
+        for i in xrange(colonyCount):
+            report = {}
+            report['colony'] = i
+            report['seed']   = int(seeds[i])
+            report['time']   = colonyResults[i][2]
+            report['cycles'] = colonyResults[i][1]
+            self.colonyReports.append(report)
+
+        # Store First Colony Reverse Pass and Its Pheromone Map
+        forwardPass, reversePass = colonyResults[0][3]
+        reversePass.bilateralMatrix = reverseResults[0]
+        reversePass.filteredMatrix  = reverseResults[1]
+        self.storePass(reversePass)
+        self.combinedPheromoneMatrix = self.combinePheromone(forwardPass, reversePass)
+
+        # Average Colony Traces
+        traceMatrix = N.zeros_like(imageMatrix, dtype = colonyResults[0][0].dtype)
+        for colonyTrace, _, _, _ in colonyResults:
+            traceMatrix += colonyTrace
+        traceMatrix /= colonyCount
+
+        # Adjust Trace Image
+        traceMatrix /= N.max(traceMatrix)
+
+        # Return Trace Matrix
+        return traceMatrix
+
+    def combinePheromone(self, forwardPass, reversePass):
+        """numpy.array combinePheromone(ColonyPass forwardPass, ColonyPass reversePass)"""
+        return 0.5 * (forwardPass.pheromoneMatrix + N.fliplr(reversePass.pheromoneMatrix))
+
+    def run(self, imageMatrix, parameterSet):
+        """numpy.array run(numpy.array imageMatrix, dict parameterSet)"""
+
+        # Drop the Previous Image Pheromone Map
+        self.combinedPheromoneMatrix = None
+
+        # Column Strips for Wide Scans
+        if ('stripWidth' in parameterSet):
+            return self.runTiled(imageMatrix, parameterSet)
+
+        # Multiple Independent Colonies
+        if (parameterSet.get('colonies', 1) > 1):
+            return self.runColonies(imageMatrix, parameterSet)
+
+        # Filter Once, Mirror for the Reverse Direction
+        forwardResults = self.filterImage(imageMatrix, parameterSet)
+        reverseResults = self.flipFilterResults(forwardResults)
+
+        # Algorithm - First and Second Pass
+        forwardPass, reversePass = self.runPasses([imageMatrix, N.fliplr(imageMatrix)],
+                                                  [forwardResults, reverseResults], parameterSet)
+
+        # Store Last Pass Matrices
+        self.storePass(reversePass)
+
+        # Pass Reports
+        self.passReports = [self.getPassReport(forwardPass, 'forward'), self.getPassReport(reversePass, 'reverse')]
+
+        # Merge Pheromone Maps in Image Orientation
+        self.combinedPheromoneMatrix = self.combinePheromone(forwardPass, reversePass)
+
+        # Merge Traces
+        traceMatrix  = forwardPass.traceMatrix
+        traceMatrix += N.fliplr(reversePass.traceMatrix)
+
+        # Adjust Trace Image
+        traceMatrix /= N.max(traceMatrix)
+
+        # Return Trace Matrix
+        return traceMatrix
+
+    def extractLayers(self, traceMatrix, parameterSet = None):
+        """numpy.array extractLayers(numpy.array traceMatrix[, dict parameterSet = None])"""
+        if (parameterSet is None):
+            parameterSet = {}
+        pheromoneMatrix = None
+        if (parameterSet.get('pheromoneWeight', 0.25) > 0.):
+            pheromoneMatrix = self.combinedPheromoneMatrix
+        return self.layerTools.extractLayers(traceMatrix, parameterSet.get('layerCount', 8), pheromoneMatrix,
+                                             parameterSet.get('pheromoneWeight', 0.25), parameterSet.get('scoreGamma', 0.5),
+                                             parameterSet.get('layerGap', 1), parameterSet.get('layerSmoothness', 0.2),
+                                             backend = parameterSet.get('backend', 'numpy'),
+                                             sweeps = parameterSet.get('layerSweeps', 4))
+
+    def runVolume(self, volumeMatrix, parameterSet):
+        """numpy.array runVolume(numpy.array volumeMatrix, dict parameterSet)"""
+
+        # Drop the Previous Image Pheromone Map
+        self.combinedPheromoneMatrix = None
+
+        # Parameters
+        cycleCount   = parameterSet['cycleCount']
+        warmWeight   = parameterSet.get('warmWeight', 0.05)
+        regionMargin = parameterSet.get('regionMargin', 10)
+
+        # Warm Slice Parameters
+        warmParameters = dict(parameterSet)
+        warmParameters['cycleCount'] = parameterSet.get('warmCycleCount', max(1, cycleCount // 3))
+
+        # Slice Generators
+        sliceCount   = volumeMatrix.shape[0]
+        randomStates = self.createRandomStates(2 * sliceCount, parameterSet)
+
+        # Trace Volume
+        traceVolume = None
+        previousPasses = None
+        priorLimits    = None
+
+        # For Each Slice
+        for index in xrange(sliceCount):
+
+            # Filter Once, Mirror for the Reverse Direction
+            imageMatrix = volumeMatrix[index]
+            forwardResults = self.filterImage(imageMatrix, parameterSet)
+            reverseResults = self.flipFilterResults(forwardResults)
+            passInputs = [(imageMatrix, forwardResults), (N.fliplr(imageMatrix), reverseResults)]
+
+            # Both Directions
+            colonyPasses = []
+            for direction in xrange(2):
+                matrix, filterResults = passInputs[direction]
+                randomState = randomStates[2 * index + direction]
+                if (previousPasses is None):
+                    colonyPass = self.preparePass(matrix, randomState, filterResults)
+                    sliceParameters = parameterSet
+                else:
+                    # First Slice Region as Prior (Widened Once)
+                    colonyPass = self.preparePass(matrix, randomState, filterResults, priorLimits[direction])
+
+                    # Previous Slice Pheromone as Warm Start
+                    colonyPass.pheromoneMatrix += warmWeight * previousPasses[direction].pheromoneMatrix
+                    sliceParameters = warmParameters
+                colonyPasses.append(self.walkPass(colonyPass, sliceParameters))
+
+            # Merge Traces
+            traceMatrix  = colonyPasses[0].traceMatrix
+            traceMatrix += N.fliplr(colonyPasses[1].traceMatrix)
+            traceMatrix /= N.max(traceMatrix)
+            if (traceVolume is None):
+                traceVolume = N.zeros(volumeMatrix.shape, dtype = traceMatrix.dtype)
+            traceVolume[index] = traceMatrix
+            previousPasses = colonyPasses
+
+            # Widened First Slice Regions
+            if (priorLimits is None):
+                priorLimits = []
+                for colonyPass in colonyPasses:
+                    priorLimits.append(N.array([max(0, colonyPass.limit[0] - regionMargin),
+                                                min(imageMatrix.shape[0] - 1, colonyPass.limit[1] + regionMargin)]))
+
+        # Store Last Pass Matrices
+        self.storePass(previousPasses[1])
+
+        # Return Trace Volume
+        return traceVolume
+
+    def runPyramid(self, imageMatrix, parameterSet):
+        """numpy.array runPyramid(numpy.array imageMatrix, dict parameterSet)"""
+
+        # Drop the Previous Image Pheromone Map
+        self.combinedPheromoneMatrix = None
+
+        # Parameters
+        levelCount    = parameterSet.get('levels', 2)
+        cycleCount    = parameterSet['cycleCount']
+        pyramidWeight = parameterSet.get('pyramidWeight', 0.25)
+        bandMargin    = parameterSet.get('bandMargin', 4)
+
+        # Fine Level Parameters
+        fineParameters = dict(parameterSet)
+        fineParameters['cycleCount'] = parameterSet.get('fineCycleCount', max(1, cycleCount // 3))
+
+        # Level Generators
+        randomStates = self.createRandomStates(2 * levelCount, parameterSet)
+
+        # Coarse to Fine
+        previousPasses = None
+        previousTrace  = None
+        for level in xrange(levelCount - 1, -1, -1):
+
+            # Level Image
+            scale = 2 ** level
+            levelShape = (max(3, imageMatrix.shape[0] // scale), max(3, imageMatrix.shape[1] // scale))
+            if (level > 0):
+                levelMatrix = self.mathTools.resize(imageMatrix, levelShape)
+                levelParameters = parameterSet
+            else:
+                levelMatrix = imageMatrix
+                levelParameters = fineParameters
+
+            # Filter Once, Mirror for the Reverse Direction
+            forwardResults = self.filterImage(levelMatrix, parameterSet)
+            reverseResults = self.flipFilterResults(forwardResults)
+            passInputs = [(levelMatrix, forwardResults), (N.fliplr(levelMatrix), reverseResults)]
+
+            # Band Around the Coarse Layers
+            limit = None
+            if (previousTrace is not None):
+                layerRows = N.where(N.any(self.imageHandler.selectLayers(previousTrace, 8) > 0, axis = 1))[0]
+                factor = float(levelMatrix.shape[0]) / previousTrace.shape[0]
+                limit = N.array([max(0, int((layerRows[0] - bandMargin) * factor)),
+                                 min(levelMatrix.shape[0] - 1, int((layerRows[-1] + bandMargin + 1) * factor))])
+
+            # Both Directions
+            colonyPasses = []
+            for direction in xrange(2):
+                matrix, filterResults = passInputs[direction]
+                randomState = randomStates[2 * level + direction]
+                colonyPass = self.preparePass(matrix, randomState, filterResults, limit)
+
+                # Upsampled Coarse Pheromone and Trace as Initial Pheromone
+                if (previousPasses is not None):
+                    previousPass = previousPasses[direction]
+                    coarseTrace  = previousPass.traceMatrix / max(N.max(previousPass.traceMatrix), 1e-12)
+                    coarsePrior  = 0.5 * (previousPass.pheromoneMatrix + coarseTrace)
+                    coarsePrior  = self.mathTools.resize(coarsePrior.astype(N.float32), matrix.shape)
+                    colonyPass.pheromoneMatrix += pyramidWeight * coarsePrior
+
+                colonyPasses.append(self.walkPass(colonyPass, levelParameters))
+
+            # Merge Traces
+            traceMatrix  = N.copy(colonyPasses[0].traceMatrix)
+            traceMatrix += N.fliplr(colonyPasses[1].traceMatrix)
+            traceMatrix /= N.max(traceMatrix)
+            previousPasses = colonyPasses
+            previousTrace  = traceMatrix
+
+        # Store Last Pass Matrices and the Finest Pheromone Map
+        self.storePass(previousPasses[1])
+        self.combinedPheromoneMatrix = self.combinePheromone(previousPasses[0], previousPasses[1])
+
+        # Return Trace Matrix
+        return previousTrace
+
+    def spillStrips(self, imageMatrix, strips, parameterSet, spillDirectory):
+        """tuple spillStrips(numpy.array imageMatrix, list strips, dict parameterSet, str spillDirectory)"""
+
+        # Parameters
+        filterParameters = self.getFilterParameters(parameterSet)
+        stripMargin = self.getStripMargin(filterParameters, parameterSet)
+        matrixWidth = imageMatrix.shape[1]
+
+        # Global Maxima
+        stackMaxima   = None
+        regionProfile = N.zeros(imageMatrix.shape[0])
+
+        # For Each Strip
+        for s, (start, stop) in enumerate(strips):
+
+            # Filter the Strip with Margins Wider than the Filter Footprints
+            lower = max(0, start - stripMargin)
+            upper = min(matrixWidth, stop + stripMargin)
+            windowMatrix = imageMatrix[:, lower: upper]
+            _, _, heuristicStack, gradientMatrix = self.filterMatrices(windowMatrix, filterParameters)
+            regionMatrix = self.imageHandler.getRegionMatrix(windowMatrix)
+
+            # Crop Margins
+            heuristicStack = heuristicStack[:, :, start - lower: stop - lower]
+            gradientMatrix = gradientMatrix[:, start - lower: stop - lower]
+            regionMatrix   = regionMatrix[:, start - lower: stop - lower]
+
+            # Track Direction Maxima and Row Profile
+            stripMaxima = N.max(heuristicStack, axis = (1, 2))
+            stackMaxima = stripMaxima if stackMaxima is None else N.maximum(stackMaxima, stripMaxima)
+            regionProfile = N.maximum(regionProfile, N.max(regionMatrix, axis = 1))
+
+            # Spill Unscaled Heuristics
+            N.save(P.join(spillDirectory, 'heuristic' + str(s) + '.npy'), heuristicStack)
+            N.save(P.join(spillDirectory, 'gradient' + str(s) + '.npy'), gradientMatrix)
+
+        # Return Global Maxima
+        return stackMaxima, regionProfile
+
+    def getStripMargin(self, filterParameters, parameterSet):
+        """int getStripMargin(dict filterParameters, dict parameterSet)"""
+
+        # Bilateral Radius (OpenCV Derives It from Sigma When the Diameter is Not Positive)
+        diameter = filterParameters['bilateralDiameter']
+        radius = diameter // 2 if diameter > 0 else int(round(1.5 * filterParameters['bilateralSigma']))
+
+        # Filter Footprints: Iterated Bilateral, Median Row Window, Gradient Neighbour and Region Filter
+        filterMargin = filterParameters['bilateralIterations'] * radius + filterParameters['medianWidth'] // 2 + 1
+        requiredMargin = max(filterMargin, self.imageHandler.getRegionMargin())
+
+        # Narrower Margins Would Change the Strip Heuristics
+        stripMargin = parameterSet.get('stripMargin', requiredMargin)
+        if (stripMargin < requiredMargin):
+            raise ValueError('Strip margin ' + str(stripMargin) + ' is narrower than the filter footprint ' +
+                             str(requiredMargin))
+        return stripMargin
+
+    def loadStrip(self, s, stackMaxima, reverse, precision, spillDirectory):
+        """tuple loadStrip(int s, numpy.array stackMaxima, bool reverse, type precision, str spillDirectory)"""
+        heuristicStack = N.load(P.join(spillDirectory, 'heuristic' + str(s) + '.npy'))
+        gradientMatrix = N.load(P.join(spillDirectory, 'gradient' + str(s) + '.npy'))
+
+        # Scale Brightness
+        heuristicStack /= stackMaxima[:, None, None]
+
+        # Mirrored Strips Swap the Diagonals
+        if (reverse):
+            heuristicStack = heuristicStack[:, :, ::-1][[0, 3, 2, 1]]
+            gradientMatrix = gradientMatrix[:, ::-1]
+
+        # Strip Pheromone Matrix (Filter Precision)
+        return heuristicStack, gradientMatrix.astype(precision) + precision(0.01)
+
+    def createCycleStates(self, limit, stepCount, randomState, parameterSet):
+        """tuple createCycleStates(numpy.array limit, int stepCount, numpy.random.RandomState randomState, dict parameterSet)"""
+
+        # Ant Starting Search Space
+        startRows = N.arange(limit[0], limit[1] + 1)
+        antCount  = self.getAntCount(limit, parameterSet)
+
+        # Starting Rows and Generator State of Every Cycle (Draws Skipped in Blocks)
+        cycleRows   = []
+        cycleStates = []
+        for cycle in xrange(parameterSet['cycleCount']):
+            cycleRows.append(self.getColonyRows(startRows, antCount, randomState))
+            cycleStates.append(randomState.get_state())
+            remaining = stepCount * antCount
+            while (remaining > 0):
+                blockSize = min(remaining, 1 << 20)
+                randomState.random_sample(blockSize)
+                remaining -= blockSize
+
+        # Return Cycle Entry Points
+        return cycleRows, cycleStates
+
+    def walkStrips(self, strips, limit, randomState, stackMaxima, reverse, outputMatrix, parameterSet, spillDirectory):
+        """ColonyPass walkStrips(list strips, numpy.array limit, numpy.random.RandomState randomState,
+        numpy.array stackMaxima, bool reverse, numpy.array outputMatrix, dict parameterSet, str spillDirectory)"""
+
+        # Parameters
+        cycleCount = parameterSet['cycleCount']
+        rho        = parameterSet['rho']
+        psi        = parameterSet['psi']
+        precision  = self.getPrecision(self.getFilterParameters(parameterSet))
+
+        # Colony Pass Accounting
+        colonyPass = ColonyPass()
+        colonyPass.limit       = limit
+        colonyPass.randomState = randomState
+        colonyPass.walkStart   = time.time()
+
+        # Cycle Entry Points (Strips are Walked Cycle by Cycle from These)
+        stepCount = outputMatrix.shape[1] - 1
+        cycleRows, cycleStates = self.createCycleStates(limit, stepCount, randomState, parameterSet)
+
+        # Strip Order in Walk Direction
+        order = range(len(strips))
+        if (reverse):
+            order.reverse()
+
+        # For Each Strip
+        for i, s in enumerate(order):
+            start, stop = strips[s]
+            heuristicStack, pheromoneMatrix = self.loadStrip(s, stackMaxima, reverse, precision, spillDirectory)
+            traceMatrix    = self.createTraceMatrix(pheromoneMatrix.shape, precision)
+            traceIncrement = self.getTraceIncrement(traceMatrix)
+            firstColumn    = 1 if i == 0 else 0
+
+            # For Each Cycle (Resume Ant Rows and Generator Where the Previous Strip Ended)
+            for cycle in xrange(cycleCount):
+                startTime = pt.profiler.start()
+                randomState.set_state(cycleStates[cycle])
+                cycleRows[cycle] = self.walkColumns(pheromoneMatrix, heuristicStack, traceMatrix, cycleRows[cycle],
+                                                    firstColumn, randomState, rho, traceIncrement)
+                cycleStates[cycle] = randomState.get_state()
+
+                # Global Pheromone Update
+                pheromoneMatrix = (1 - psi) * pheromoneMatrix
+                pt.profiler.stop('cycle', startTime)
+                pt.profiler.count('antSteps', len(cycleRows[cycle]) * (stop - start - firstColumn))
+
+            # Scale Visit Counter to Trace Units
+            if (traceMatrix.dtype.kind == 'i'):
+                traceMatrix = traceMatrix.astype(precision) * precision(0.01)
+
+            # Stream Strip Trace in Image Orientation
+            if (reverse):
+                outputMatrix[:, start: stop] += traceMatrix[:, ::-1]
+            else:
+                outputMatrix[:, start: stop] = traceMatrix
+
+        # Return Colony Pass
+        colonyPass.cyclesUsed = cycleCount
+        colonyPass.stopReason = 'cycleCount'
+        return colonyPass
+
+    def runTiled(self, imageMatrix, parameterSet, outputMatrix = None):
+        """numpy.array runTiled(numpy.array imageMatrix, dict parameterSet[, numpy.array outputMatrix = None])"""
+
+        # No Pheromone Map (Full Pass Matrices are Never Held)
+        self.combinedPheromoneMatrix = None
+
+        # Parameters
+        stripWidth = parameterSet.get('stripWidth', 128)
+        if (self.isAdaptive(parameterSet)):
+            raise ValueError('Tiled runs need a fixed cycle count')
+        if (parameterSet.get('colonies', 1) > 1):
+            raise ValueError('Tiled runs support a single colony')
+        if (parameterSet.get('engine', 'vectorized') != 'vectorized' or parameterSet.get('backend', 'numpy') != 'numpy'):
+            raise ValueError('Tiled runs support the vectorized engine with the numpy backend')
+        precision = self.getPrecision(self.getFilterParameters(parameterSet))
+
+        # Column Strips
+        matrixWidth = imageMatrix.shape[1]
+        strips = [(start, min(start + stripWidth, matrixWidth)) for start in xrange(0, matrixWidth, stripWidth)]
+
+        # Trace Output (May be Memory-Mapped by the Caller)
+        if (outputMatrix is None):
+            outputMatrix = N.zeros(imageMatrix.shape, dtype = precision)
+
+        spillDirectory = tempfile.mkdtemp(prefix = 'strips', dir = parameterSet.get('spillDirectory', None))
+        try:
+            # Filter Strips Once, Spill Heuristics to Disk
+            stackMaxima, regionProfile = self.spillStrips(imageMatrix, strips, parameterSet, spillDirectory)
+            limit = self.imageHandler.getRegionLimits(regionProfile)
+
+            # Algorithm - First and Second Pass
+            randomStates = self.createRandomStates(2, parameterSet)
+            forwardPass = self.walkStrips(strips, limit, randomStates[0], stackMaxima, False, outputMatrix,
+                                          parameterSet, spillDirectory)
+            reversePass = self.walkStrips(strips, limit, randomStates[1], stackMaxima, True, outputMatrix,
+                                          parameterSet, spillDirectory)
+        finally:
+            shutil.rmtree(spillDirectory, ignore_errors = True)
+
+        # Pass Reports (Full Pass Matrices are Never Held)
+        self.passReports = [self.getPassReport(forwardPass, 'forward'), self.getPassReport(reversePass, 'reverse')]
+
+        # Adjust Trace Image Strip by Strip
+        maximum = max(N.max(outputMatrix[:, start: stop]) for start, stop in strips)
+        for start, stop in strips:
+            outputMatrix[:, start: stop] /= maximum
+
+        # Return Trace Matrix
+        return outputMatrix
+
+class ColonyPass(object):
+    """Single Direction Colony State"""
+
+    def __init__(self):
+        # Matrices
+        self.bilateralMatrix   = None
+        self.filteredMatrix    = None
+        self.heuristicMatrices = None
+        self.pheromoneMatrix   = None
+        self.traceMatrix       = None
+        # Search Space
+        self.limit       = None
+        self.randomState = None
+        # Cycle Accounting
+        self.walkStart        = None
+        self.cyclesUsed       = 0
+        self.stopReason       = None
+        self.convergence      = []
+        self.convergenceState = None
+
+colonyTemplates = None
+
+def runColonyPass(task):
+    """ColonyPass runColonyPass(tuple task)"""
+    colonyPass = AntColonyRacer().runPass(*task)
+    colonyPass.heuristicMatrices = None
+    return colonyPass
+
+def viewMatrix(sharedMatrix):
+    """numpy.array viewMatrix(tuple sharedMatrix)"""
+    sharedArray, dtype, shape = sharedMatrix
+    return N.frombuffer(sharedArray, dtype = dtype).reshape(shape)
+
+def initializeColonies(templates):
+    """initializeColonies(tuple templates)"""
+    global colonyTemplates
+    colonyTemplates = []
+    for template in templates:
+        colonyPass = ColonyPass()
+        colonyPass.heuristicMatrices = list(viewMatrix(template.heuristicMatrices))
+        colonyPass.pheromoneMatrix   = viewMatrix(template.pheromoneMatrix)
+        colonyPass.limit             = template.limit
+        colonyTemplates.append(colonyPass)
+
+def runColony(task):
+    """tuple runColony(tuple task)"""
+
+    # Colony Parameters
+    parameterSet, seed, keepPasses = task
+    randomState = N.random.RandomState(seed)
+    antColonyRacer = AntColonyRacer()
+
+    # Start Timer
+    start = time.time()
+
+    # Walk Both Directions from the Shared Templates
+    colonyPasses = []
+    for template in colonyTemplates:
+        colonyPass = ColonyPass()
+        colonyPass.heuristicMatrices = template.heuristicMatrices
+        colonyPass.pheromoneMatrix   = N.copy(template.pheromoneMatrix)
+        colonyPass.traceMatrix       = antColonyRacer.createTraceMatrix(template.pheromoneMatrix.shape,
+                                                                        template.pheromoneMatrix.dtype.type)
+        colonyPass.limit             = template.limit
+        colonyPass.randomState       = randomState
+        antColonyRacer.walkPass(colonyPass, parameterSet)
+        colonyPass.heuristicMatrices = None
+        colonyPass.randomState       = None
+        colonyPasses.append(colonyPass)
+
+    # End Timer
+    end = time.time()
+
+    # Merged Colony Trace
+    forwardPass, reversePass = colonyPasses
+    traceMatrix  = N.copy(forwardPass.traceMatrix)
+    traceMatrix += N.fliplr(reversePass.traceMatrix)
+
+    # Return Trace, Cycles, Time and (First Colony Only) Passes
+    cycles = [forwardPass.cyclesUsed, reversePass.cyclesUsed]
+    return traceMatrix, cycles, end - start, (forwardPass, reversePass) if keepPasses else None
+
+if __name__ == '__main__':
+    if (len(sys.argv) < 3):
+        print 'python AntColonyRacer.py sourceFile destinationFile'
+    else:
+        # Toolboxes
+        imageHandler = ih.ImageHandler()
+
+        # Load Image Matrix
+        sourceFile  = sys.argv[1]
+        imageMatrix = imageHandler.getGrayscaleMatrix(sourceFile)
+
+        # Fill Parameters
+        parameterSet = {}
+        parameterSet['cycleCount'] = 10
+        parameterSet['rho'] = 1.0
+        parameterSet['psi'] = 0.1
+
+        # Run Algorithm
+        antColonyRacer = AntColonyRacer()
+        traceMatrix = antColonyRacer.run(imageMatrix, parameterSet)
+
+        # Save Image
+        destinationFile = sys.argv[2]
         imageHandler.saveImage(traceMatrix, destinationFile)
\ No newline at end of file
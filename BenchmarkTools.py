@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import numpy as N
+import os.path as P
+import multiprocessing as mp
+
+import DataHandler as dh
+import ImageHandler as ih
+import MetricTools as mtr
+import AntColonyRacer as acr
+
+defaultSizes = [(248, 305), (496, 610), (992, 1220)]
+defaultColonies = [(10, None), (3, 100)]
+
+def legacyTextToMatrix(path):
+    data = open(path)
+    lines = data.readlines()
+    data.close()
+    rowList = []
+    for line in lines:
+        row = line.strip('\n').split(',')
+        row = list(map(float, row))
+        rowList.append(N.array(row).astype(int))
+    imageMatrix = rowList[0]
+    for i in xrange(1, len(rowList)):
+        imageMatrix = N.vstack([imageMatrix, rowList[i]])
+    return imageMatrix
+
+def timeCall(function, argument, repeats):
+    timings = []
+    for _ in xrange(repeats):
+        start = time.time()
+        result = function(argument)
+        timings.append(time.time() - start)
+    return result, N.median(timings)
+
+def benchmarkTextToMatrix(paths, repeats = 3):
+    dataHandler = dh.DataHandler()
+    legacyTotal = 0.
+    streamTotal = 0.
+    for path in paths:
+        legacyMatrix, legacyTime = timeCall(legacyTextToMatrix, path, repeats)
+        streamMatrix, streamTime = timeCall(dataHandler.textToMatrix, path, repeats)
+        if (legacyMatrix.dtype != streamMatrix.dtype or legacyMatrix.tobytes() != streamMatrix.tobytes()
+            or legacyMatrix.shape != streamMatrix.shape):
+            raise AssertionError('textToMatrix mismatch: ' + path)
+        legacyTotal += legacyTime
+        streamTotal += streamTime
+    print 'textToMatrix files  :', len(paths)
+    print 'legacy   (s)        :', round(legacyTotal, 4)
+    print 'streaming (s)       :', round(streamTotal, 4)
+    print 'speedup             :', round(legacyTotal / streamTotal, 1)
+    return { 'files': len(paths), 'legacy': legacyTotal, 'streaming': streamTotal }
+
+def createSyntheticScan(height, width, seed = 0, layerCount = 8):
+    randomState = N.random.RandomState(seed)
+    columns = N.arange(width)
+
+    # Curved Retina Surface
+    phase = randomState.uniform(0., 2. * N.pi)
+    surface  = 0.3 * height + 0.08 * height * N.sin(2. * N.pi * columns / width + phase)
+    surface += randomState.normal(0., 0.002 * height, width).cumsum() / N.sqrt(width)
+
+    # Stacked Layer Boundaries
+    thickness = randomState.uniform(0.01, 0.05, layerCount) * height
+    layers = N.clip(surface[None, :] + N.cumsum(thickness)[:, None], 0, height - 1)
+
+    # Band Intensities with Speckle Noise
+    intensities = N.concatenate([[0.05], randomState.uniform(0.2, 0.9, layerCount)])
+    rows = N.arange(height)[:, None]
+    bands = N.sum(rows[None, :, :] >= layers[:, None, :], axis = 0)
+    scanMatrix  = intensities[bands]
+    scanMatrix *= randomState.gamma(4., 0.25, (height, width))
+    return N.clip(scanMatrix, 0., 1.), N.round(layers)
+
+def createSyntheticText(path, rows, columns = 10, seed = 0):
+    randomState = N.random.RandomState(seed)
+    values = randomState.uniform(50., 400., (rows, columns))
+    data = open(path, 'w')
+    for row in values:
+        data.write(','.join(repr(float(value)) for value in row) + '\n')
+    data.close()
+
+def timeRepeats(function, arguments, repeats, warmup = 1):
+    for _ in xrange(warmup):
+        function(*arguments)
+    timings = []
+    for _ in xrange(repeats):
+        start = time.time()
+        function(*arguments)
+        timings.append(time.time() - start)
+    return timings
+
+def summarizeTimings(timings, pixels):
+    summary = {}
+    summary['median'] = float(N.median(timings))
+    summary['p10']    = float(N.percentile(timings, 10))
+    summary['p90']    = float(N.percentile(timings, 90))
+    summary['pixels'] = pixels
+    summary['pixelsPerSecond'] = pixels / summary['median'] if summary['median'] > 0. else 0.
+    return summary
+
+def getPeakMemory():
+    # Linux Reports ru_maxrss in KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+def createCases(sizes = defaultSizes, colonies = defaultColonies):
+    cases = []
+    for height, width in sizes:
+        shape = str(height) + 'x' + str(width)
+        cases.append(('generateHeuristicMatrices ' + shape, 'heuristics', height, width, None))
+        cases.append(('getRelevantRegion ' + shape, 'region', height, width, None))
+        for cycleCount, antCount in colonies:
+            settings = { 'cycleCount': cycleCount, 'antCount': antCount }
+            ants = 'all' if antCount is None else str(antCount)
+            cases.append(('generateTraceMatrix ' + shape + ' c' + str(cycleCount) + ' a' + ants,
+                          'trace', height, width, settings))
+        cases.append(('selectLayers ' + shape, 'select', height, width, None))
+        cases.append(('metrics ' + shape, 'metrics', height, width, None))
+        cases.append(('textToMatrix ' + str(width) + 'x10', 'text', height, width, None))
+    return cases
+
+def runCase(task):
+    case, repeats, seed = task
+    name, kind, height, width, settings = case
+    imageHandler = ih.ImageHandler()
+    metricTools  = mtr.MetricTools()
+    scanMatrix, truthLayers = createSyntheticScan(height, width, seed)
+    pixels = height * width
+
+    # Hot Path Selection
+    if (kind == 'heuristics'):
+        function  = acr.AntColonyRacer().generateHeuristicMatrices
+        arguments = (scanMatrix,)
+    elif (kind == 'region'):
+        function  = imageHandler.getRelevantRegion
+        arguments = (scanMatrix,)
+    elif (kind == 'trace'):
+        parameterSet = { 'cycleCount': settings['cycleCount'], 'rho': 1.0, 'psi': 0.1, 'seed': seed }
+        if (settings['antCount'] is not None):
+            parameterSet['antCount'] = settings['antCount']
+        function  = acr.AntColonyRacer().generateTraceMatrix
+        arguments = (scanMatrix, parameterSet)
+    elif (kind == 'select'):
+        traceMatrix = N.random.RandomState(seed).random_sample((height, width))
+        function  = metricTools.selectLayers
+        arguments = (traceMatrix, 8)
+    elif (kind == 'metrics'):
+        layerMatrix = metricTools.selectLayers(N.random.RandomState(seed).random_sample((height, width)), 8)
+        def function(layerMatrix, truthLayers):
+            truthMatrix = metricTools.getTruthMatrix(truthLayers, layerMatrix.shape)
+            metricTools.getAccuracy(layerMatrix, truthMatrix)
+            metricTools.getCoverage(layerMatrix, truthLayers)
+        arguments = (layerMatrix, truthLayers)
+    elif (kind == 'text'):
+        directory = tempfile.mkdtemp()
+        path = P.join(directory, 'synthetic.txt')
+        createSyntheticText(path, width, 10, seed)
+        function  = dh.DataHandler().textToMatrix
+        arguments = (path,)
+        pixels = width * 10
+    else:
+        raise ValueError('Unknown benchmark case: ' + str(kind))
+
+    # Timed Repeats
+    try:
+        timings = timeRepeats(function, arguments, repeats)
+    finally:
+        if (kind == 'text'):
+            shutil.rmtree(directory)
+    summary = summarizeTimings(timings, pixels)
+    summary['peakMemory'] = getPeakMemory()
+    return name, summary
+
+def runSuite(cases, repeats = 5, seed = 0, isolate = True):
+    tasks = [(case, repeats, seed) for case in cases]
+    if (isolate):
+        # Fresh Process per Case Keeps Peak Memory Separate
+        pool = mp.Pool(1, maxtasksperchild = 1)
+        try:
+            results = pool.map(runCase, tasks, 1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = map(runCase, tasks)
+    report = {}
+    report['environment'] = { 'python': platform.python_version(), 'numpy': N.__version__,
+                              'machine': platform.machine(), 'repeats': repeats, 'seed': seed }
+    report['cases'] = dict(results)
+    return report
+
+def printReport(report):
+    print 'Case Median P10 P90 Mpx/s PeakMiB'
+    print '================================='
+    for name in sorted(report['cases']):
+        summary = report['cases'][name]
+        print name, round(summary['median'], 4), round(summary['p10'], 4), round(summary['p90'], 4), \
+              round(summary['pixelsPerSecond'] / 1e6, 2), int(summary['peakMemory'])
+
+def saveBaseline(report, path):
+    data = open(path, 'w')
+    json.dump(report, data, indent = 1, sort_keys = True)
+    data.close()
+
+def loadBaseline(path):
+    data = open(path)
+    report = json.load(data)
+    data.close()
+    return report
+
+def compareReports(report, baseline, threshold = 0.1):
+    regressions = []
+    print 'Case Baseline Current Ratio'
+    print '==========================='
+    for name in sorted(report['cases']):
+        if (name not in baseline['cases']):
+            continue
+        previous = baseline['cases'][name]['median']
+        current  = report['cases'][name]['median']
+        ratio = current / previous if previous > 0. else 1.
+        flag = ''
+        if (ratio > 1. + threshold):
+            flag = ' REGRESSION'
+            regressions.append(name)
+        print name, round(previous, 4), round(current, 4), str(round(ratio, 2)) + flag
+    return regressions
+
+def parseSize(text):
+    height, width = text.lower().split('x')
+    return int(height), int(width)
+
+if (__name__ == '__main__'):
+    parser = argparse.ArgumentParser(description = 'Hot path benchmark suite on synthetic B-scans')
+    parser.add_argument('--sizes', type = parseSize, nargs = '+', default = defaultSizes)
+    parser.add_argument('--cycles', type = int, nargs = '+', default = None)
+    parser.add_argument('--ants', type = int, default = None)
+    parser.add_argument('--repeats', type = int, default = 5)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--filter', default = None)
+    parser.add_argument('--inline', action = 'store_true')
+    parser.add_argument('--save', default = None)
+    parser.add_argument('--compare', default = None)
+    parser.add_argument('--threshold', type = float, default = 0.1)
+    parser.add_argument('--legacy-text', action = 'store_true')
+    arguments = parser.parse_args()
+
+    if (arguments.legacy_text):
+        benchmarkTextToMatrix(sorted(glob.glob(P.join('data', 'Subject*_*.txt'))))
+        sys.exit(0)
+
+    colonies = defaultColonies
+    if (arguments.cycles is not None):
+        colonies = [(cycleCount, arguments.ants) for cycleCount in arguments.cycles]
+    cases = createCases(arguments.sizes, colonies)
+    if (arguments.filter is not None):
+        cases = [case for case in cases if arguments.filter in case[0]]
+    report = runSuite(cases, arguments.repeats, arguments.seed, not arguments.inline)
+    printReport(report)
+    if (arguments.save is not None):
+        saveBaseline(report, arguments.save)
+    if (arguments.compare is not None):
+        regressions = compareReports(report, loadBaseline(arguments.compare), arguments.threshold)
+        if (regressions):
+            sys.exit(1)
\ No newline at end of file
@@ -1,78 +1,153 @@
-# -*- coding: utf-8 -*-
-
-import numpy as N
-
-class DataHandler(object):
-    """Data File Manipulator"""
-
-    def format(self, number):
-        """format(int number)"""
-        if (number == 0):
-            return '0.00'
-        string = str(number)
-        length = len(string)
-        if (length < 4):
-            string += '0'
-        return string[0: 4]
-
-    def textToMatrix(self, path):
-        """numpy.array textToImage(str path)"""
-        data = open(path)
-        lines = data.readlines()
-        data.close()
-        rowList = []
-        for line in lines:
-            row = line.strip('\n').split(',')
-            row = list(map(float, row))
-            rowList.append(N.array(row).astype(int))
-        imageMatrix = rowList[0]
-        for i in xrange(1, len(rowList)):
-            imageMatrix = N.vstack([imageMatrix, rowList[i]])
-        return imageMatrix
-
-    def saveReport(self, experimentData, path):
-        """saveReport(list experimentData, str path)"""
-        data = open(path, 'w')
-        data.write('ACCURACY\n\n')
-        data.write('Name TP FP FN Acc\n')
-        data.write('=================\n')
-        length = len(experimentData)
-        for i in xrange(length - 1):
-            name =     experimentData[i]['name'] + ' '
-            tp   = str(experimentData[i]['tp'])  + ' '
-            fp   = str(experimentData[i]['fp'])  + ' '
-            fn   = str(experimentData[i]['fn'])  + ' '
-            acc  = self.format(experimentData[i]['acc']) + '\n'
-            line = name + tp + fp + fn + acc
-            data.write(line)
-        data.write('Mean: ' + str(experimentData[-1]['accMean'])  + '\n')
-        data.write('SD  : ' + str(experimentData[-1]['accStdev']) + '\n')
-        data.write('\nCOVERAGE\n\n')
-        data.write('Name L1 L2 L3 L4 L5 L6 L7 L8\n')
-        data.write('============================\n')
-        layers = len(experimentData[0]['coverage'])
-        for i in xrange(length - 1):
-            line     = experimentData[i]['name'] + ' '
-            coverage = experimentData[i]['coverage']
-            for j in xrange(layers):
-                line += self.format(coverage[j]) + ' '
-            line += '\n'
-            data.write(line)
-        meanLine  = 'Mean: '
-        stdevLine = 'SD  : '
-        for j in xrange(layers):
-            meanLine  += self.format(experimentData[-1]['covMean' ][j]) + ' '
-            stdevLine += self.format(experimentData[-1]['covStdev'][j]) + ' '
-        meanLine  += '\n'
-        stdevLine += '\n'
-        data.write(meanLine)
-        data.write(stdevLine)
-        data.write('\nTIME\n\n')
-        data.write('Name Seconds\n')
-        data.write('============\n')
-        for i in xrange(length - 1):
-            name = experimentData[i]['name'] + ' '
-            time = str(experimentData[i]['time']) + '\n'
-            line = name + time
-            data.write(line)
-        data.close()
\ No newline at end of file
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as N
+import os.path as P
+
+class DataHandler(object):
+    """Data File Manipulator"""
+
+    def format(self, number):
+        """format(int number)"""
+        if (number == 0):
+            return '0.00'
+        string = str(number)
+        length = len(string)
+        if (length < 4):
+            string += '0'
+        return string[0: 4]
+
+    def textToMatrix(self, path, chunkSize = 1048576):
+        """numpy.array textToMatrix(str path[, int chunkSize = 1048576])"""
+        data = open(path)
+        columnCount = None
+        valueCount  = 0
+        values      = N.empty(chunkSize // 8)
+        remainder   = ''
+        while (True):
+            chunk = data.read(chunkSize)
+            if (not chunk):
+                block = remainder
+                remainder = ''
+            else:
+                chunk = remainder + chunk
+                cut = chunk.rfind('\n')
+                if (cut < 0):
+                    remainder = chunk
+                    continue
+                block = chunk[0: cut]
+                remainder = chunk[cut + 1:]
+            block = block.strip()
+            if (block):
+                if (columnCount is None):
+                    columnCount = len(block.split('\n', 1)[0].split(','))
+                blockValues = N.fromstring(block.replace('\r', '').replace('\n', ','), sep = ',')
+                length = len(blockValues)
+                if (valueCount + length > len(values)):
+                    values = N.resize(values, max(2 * len(values), valueCount + length))
+                values[valueCount: valueCount + length] = blockValues
+                valueCount += length
+            if (not chunk):
+                break
+        data.close()
+        imageMatrix = values[0: valueCount].astype(int).reshape(-1, columnCount)
+        if (imageMatrix.shape[0] == 1):
+            imageMatrix = imageMatrix[0]
+        return imageMatrix
+
+    def binaryCachedMatrix(self, path, memoryMap = True):
+        """numpy.array binaryCachedMatrix(str path[, bool memoryMap = True])"""
+        binaryPath = path + '.npy'
+        if (not P.isfile(binaryPath) or P.getmtime(binaryPath) < P.getmtime(path)):
+            # Atomic Rebuild (Concurrent Readers Never See a Partial File)
+            temporaryPath = binaryPath + '.' + str(os.getpid()) + '.tmp'
+            data = open(temporaryPath, 'wb')
+            try:
+                N.save(data, self.textToMatrix(path))
+            finally:
+                data.close()
+            os.rename(temporaryPath, binaryPath)
+        if (memoryMap):
+            return N.load(binaryPath, mmap_mode = 'r')
+        return N.load(binaryPath)
+
+    def saveReport(self, experimentData, path):
+        """saveReport(list experimentData, str path)"""
+        data = open(path, 'w')
+        data.write('ACCURACY\n\n')
+        data.write('Name TP FP FN Acc\n')
+        data.write('=================\n')
+        length = len(experimentData)
+        for i in xrange(length - 1):
+            name =     experimentData[i]['name'] + ' '
+            tp   = str(experimentData[i]['tp'])  + ' '
+            fp   = str(experimentData[i]['fp'])  + ' '
+            fn   = str(experimentData[i]['fn'])  + ' '
+            acc  = self.format(experimentData[i]['acc']) + '\n'
+            line = name + tp + fp + fn + acc
+            data.write(line)
+        data.write('Mean: ' + str(experimentData[-1]['accMean'])  + '\n')
+        data.write('SD  : ' + str(experimentData[-1]['accStdev']) + '\n')
+        data.write('\nCOVERAGE\n\n')
+        data.write('Name L1 L2 L3 L4 L5 L6 L7 L8\n')
+        data.write('============================\n')
+        layers = len(experimentData[0]['coverage'])
+        for i in xrange(length - 1):
+            line     = experimentData[i]['name'] + ' '
+            coverage = experimentData[i]['coverage']
+            for j in xrange(layers):
+                line += self.format(coverage[j]) + ' '
+            line += '\n'
+            data.write(line)
+        meanLine  = 'Mean: '
+        stdevLine = 'SD  : '
+        for j in xrange(layers):
+            meanLine  += self.format(experimentData[-1]['covMean' ][j]) + ' '
+            stdevLine += self.format(experimentData[-1]['covStdev'][j]) + ' '
+        meanLine  += '\n'
+        stdevLine += '\n'
+        data.write(meanLine)
+        data.write(stdevLine)
+        data.write('\nTIME\n\n')
+        cycles = any('cycles' in stats for stats in experimentData[0: length - 1])
+        if (cycles):
+            data.write('Name Seconds Cycles\n')
+            data.write('===================\n')
+        else:
+            data.write('Name Seconds\n')
+            data.write('============\n')
+        for i in xrange(length - 1):
+            name = experimentData[i]['name'] + ' '
+            time = str(experimentData[i]['time'])
+            if (cycles):
+                time += ' ' + '/'.join(str(count) for count in experimentData[i].get('cycles', ['-']))
+            line = name + time + '\n'
+            data.write(line)
+        if (any('profile' in stats for stats in experimentData[0: length - 1])):
+            self.writeStages(experimentData, data)
+        data.close()
+
+    def writeStages(self, experimentData, data):
+        """writeStages(list experimentData, file data)"""
+        # Entries Resumed from Unprofiled Runs are Skipped
+        profiles = [stats['profile'] for stats in experimentData[0: len(experimentData) - 1] if 'profile' in stats]
+        profiled = len(profiles)
+        totals = {}
+        calls  = {}
+        antStepsPerSecond = 0.
+        for profile in profiles:
+            for stage in profile['stages']:
+                name = str(stage)
+                totals[name] = totals.get(name, 0.) + profile['stages'][stage]['seconds']
+                calls[name]  = calls.get(name, 0)   + profile['stages'][stage]['calls']
+            antStepsPerSecond += profile['antStepsPerSecond']
+        data.write('\nSTAGES\n\n')
+        data.write('Stage Calls Total Mean\n')
+        data.write('======================\n')
+        for name in sorted(totals, key = lambda name: -totals[name]):
+            count  = str(calls[name]) + ' '
+            total  = str(round(totals[name], 3)) + ' '
+            mean   = str(round(totals[name] / profiled, 3)) + '\n'
+            data.write(name + ' ' + count + total + mean)
+        data.write('Ant Steps/s: ' + str(int(antStepsPerSecond / profiled)) + '\n')
+        data.write('Profiled: ' + str(profiled) + ' of ' + str(len(experimentData) - 1) + '\n')
\ No newline at end of file
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import os
+import numpy as N
+import os.path as P
+
+import DataHandler as dh
+
+class GroundTruthStore(object):
+    """Ground Truth Layer Store"""
+
+    def __init__(self, directory = 'data', layerCount = 8, useCache = True):
+        # Toolboxes
+        self.dataHandler = dh.DataHandler()
+        # Settings
+        self.directory  = directory
+        self.layerCount = layerCount
+        self.useCache   = useCache
+        # Loaded Subjects
+        self.subjects = {}
+
+    def getLayerPaths(self, subject):
+        """list getLayerPaths(int subject)"""
+        paths = []
+        for l in xrange(1, self.layerCount + 1):
+            paths.append(P.join(self.directory, 'Subject' + str(subject) + '_' + str(l) + '.txt'))
+        return paths
+
+    def getCachePath(self, subject):
+        """str getCachePath(int subject)"""
+        return P.join(self.directory, 'Subject' + str(subject) + '_truth.npz')
+
+    def loadCache(self, subject, modificationTimes):
+        """numpy.array loadCache(int subject, numpy.array modificationTimes)"""
+        path = self.getCachePath(subject)
+        if (not P.isfile(path)):
+            return None
+        try:
+            cache = N.load(path)
+            try:
+                if (not N.array_equal(cache['modificationTimes'], modificationTimes)):
+                    return None
+                return cache['layers']
+            finally:
+                cache.close()
+        except Exception:
+            # Any Unreadable Sidecar is a Cache Miss
+            return None
+
+    def saveCache(self, subject, modificationTimes, layers):
+        """saveCache(int subject, numpy.array modificationTimes, numpy.array layers)"""
+        path = self.getCachePath(subject)
+        temporaryPath = path + '.' + str(os.getpid()) + '.tmp'
+        try:
+            data = open(temporaryPath, 'wb')
+            try:
+                N.savez_compressed(data, modificationTimes = modificationTimes, layers = layers)
+            finally:
+                data.close()
+            os.rename(temporaryPath, path)
+        except (IOError, OSError):
+            if (P.isfile(temporaryPath)):
+                os.remove(temporaryPath)
+
+    def parseSubject(self, subject):
+        """numpy.array parseSubject(int subject)"""
+        matrices = []
+        for path in self.getLayerPaths(subject):
+            matrices.append(self.dataHandler.textToMatrix(path).T)
+        return N.array(matrices).astype(int)
+
+    def getSubject(self, subject):
+        """numpy.array getSubject(int subject)"""
+
+        # Memory Cache
+        if (subject in self.subjects):
+            return self.subjects[subject]
+
+        # Sidecar Cache Keyed on Layer File Modification Times
+        modificationTimes = N.array([P.getmtime(path) for path in self.getLayerPaths(subject)])
+        layers = None
+        if (self.useCache):
+            layers = self.loadCache(subject, modificationTimes)
+
+        # Parse Layer Files Once
+        if (layers is None):
+            layers = self.parseSubject(subject)
+            if (self.useCache):
+                self.saveCache(subject, modificationTimes, layers)
+
+        # Store Subject
+        self.subjects[subject] = layers
+        return layers
+
+    def getLayers(self, subject, imageNumber):
+        """numpy.array getLayers(int subject, int imageNumber)"""
+        return self.getSubject(subject)[:, imageNumber - 1, :].astype(float)
\ No newline at end of file
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import collections
+import numpy as N
+import os.path as P
+
+class HeuristicCache(object):
+    """Content-Addressed Heuristic Matrix Cache"""
+
+    def __init__(self, directory = None, capacity = 32):
+        # Storage
+        self.directory = directory
+        self.capacity  = capacity
+        self.entries   = collections.OrderedDict()
+        # Counters
+        self.hits     = 0
+        self.diskHits = 0
+        self.misses   = 0
+        if (directory is not None and not P.isdir(directory)):
+            os.makedirs(directory)
+
+    def getKey(self, imageMatrix, filterParameters):
+        """str getKey(numpy.array imageMatrix, dict filterParameters)"""
+        imageMatrix = N.ascontiguousarray(imageMatrix)
+        digest = hashlib.sha1()
+        digest.update(str(imageMatrix.shape) + str(imageMatrix.dtype))
+        digest.update(imageMatrix.tobytes())
+        digest.update(repr(sorted(filterParameters.items())))
+        return digest.hexdigest()
+
+    def getPath(self, key):
+        """str getPath(str key)"""
+        return P.join(self.directory, key + '.npz')
+
+    def get(self, key):
+        """tuple get(str key)"""
+
+        # Memory Lookup
+        if (key in self.entries):
+            filterResults = self.entries.pop(key)
+            self.entries[key] = filterResults
+            self.hits += 1
+            return filterResults
+
+        # Disk Lookup
+        if (self.directory is not None and P.isfile(self.getPath(key))):
+            data = N.load(self.getPath(key))
+            try:
+                filterResults = (data['bilateralMatrix'], data['filteredMatrix'], list(data['heuristicMatrices']),
+                                 data['gradientMatrix'])
+            finally:
+                data.close()
+            self.store(key, filterResults)
+            self.diskHits += 1
+            return filterResults
+
+        # Miss
+        self.misses += 1
+        return None
+
+    def store(self, key, filterResults):
+        """store(str key, tuple filterResults)"""
+        self.entries[key] = filterResults
+        while (len(self.entries) > self.capacity):
+            self.entries.popitem(last = False)
+
+    def put(self, key, filterResults):
+        """put(str key, tuple filterResults)"""
+        self.store(key, filterResults)
+        if (self.directory is not None):
+            bilateralMatrix, filteredMatrix, heuristicMatrices, gradientMatrix = filterResults
+            temporaryPath = self.getPath(key) + '.' + str(os.getpid()) + '.tmp'
+            data = open(temporaryPath, 'wb')
+            N.savez(data, bilateralMatrix = bilateralMatrix, filteredMatrix = filteredMatrix,
+                    heuristicMatrices = N.array(heuristicMatrices), gradientMatrix = gradientMatrix)
+            data.close()
+            os.rename(temporaryPath, self.getPath(key))
+
+    def getStatistics(self):
+        """dict getStatistics()"""
+        statistics = {}
+        statistics['hits']     = self.hits
+        statistics['diskHits'] = self.diskHits
+        statistics['misses']   = self.misses
+        statistics['entries']  = len(self.entries)
+        return statistics
\ No newline at end of file
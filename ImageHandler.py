@@ -1,56 +1,68 @@
-# -*- coding: utf-8 -*-
-
-import numpy as N
-from PIL import Image as img
-
-import MathTools as mt
-
-class ImageHandler(object):
-    """Image File and Image Manipulator"""
-
-    def getGrayscaleMatrix(self, path):
-        """numpy.array getGrayscaleMatrix(str path)"""
-        inputImage = img.open(path).convert('L')
-        grayscaleMatrix = N.array(inputImage)/255.
-        return N.copy(grayscaleMatrix)
-    
-    def saveImage(self, matrix, path):
-        """saveImage(numpy.array matrix, str path)"""
-        outputImage = img.fromarray(N.uint8(matrix*255))
-        outputImage.save(path)
-
-    def binarizeMatrix(self, matrix, threshold):
-        """numpy.array binarizeMatrix(numpy.array matrix, float threshold)"""
-        binarizedMatrix = N.zeros_like(matrix)
-        binarizedMatrix[N.where(matrix > threshold)] = 1.
-        binarizedMatrix[N.where(matrix <= threshold)] = 0.
-        return N.copy(binarizedMatrix)
-
-    def getRelevantRegion(self, imageMatrix, weight = 5., threshold = 0.4):
-        """numpy.array getRelevantRegion(numpy.array imageMatrix, float weight, float threshold)"""
-        mathTools = mt.MathTools()
-        regionMatrix  = N.copy(imageMatrix)
-        regionMatrix  = mathTools.gaussianFilter(regionMatrix, weight)
-        regionMatrix  = mathTools.gradient(regionMatrix)
-        regionMatrix  = mathTools.normalize(regionMatrix)
-        regionMatrix /= N.max(regionMatrix)
-        thresholdMatrix = self.binarizeMatrix(regionMatrix, threshold)
-        histogram = N.sum(thresholdMatrix, axis = 1)
-        reverse   = N.flipud(histogram)
-        l  = N.where(histogram > 0)[0][0]
-        h  = imageMatrix.shape[0] - 1
-        h -= N.where(reverse   > 0)[0][0]
-        return N.array([l, h])
-
-    def selectLayers(self, matrix, count):
-        """numpy.array selectLayers(numpy.array matrix, int count)"""
-        resultMatrix = N.zeros_like(matrix)
-        height = matrix.shape[0]
-        width  = matrix.shape[1]
-        for i in xrange(width):
-            column  = N.copy(matrix[:, i])
-            indexes = column.argsort()
-            for k in xrange(count):
-                index = N.int(indexes[height - 1 - k])
-                resultMatrix[index, i] = 1.0
-        return resultMatrix
\ No newline at end of file
+# -*- coding: utf-8 -*-
+
+import numpy as N
+from PIL import Image as img
+
+import MathTools as mt
+import MetricTools as mtr
+import ProfileTools as pt
+
+class ImageHandler(object):
+    """Image File and Image Manipulator"""
+
+    def getGrayscaleMatrix(self, path, dtype = float):
+        """numpy.array getGrayscaleMatrix(str path[, type dtype = float])"""
+        inputImage = img.open(path).convert('L')
+        grayscaleMatrix = N.array(inputImage, dtype = dtype) / N.dtype(dtype).type(255.)
+        return N.copy(grayscaleMatrix)
+    
+    def saveImage(self, matrix, path):
+        """saveImage(numpy.array matrix, str path)"""
+        self.saveQuantizedImage(self.quantizeMatrix(matrix), path)
+
+    def quantizeMatrix(self, matrix):
+        """numpy.array quantizeMatrix(numpy.array matrix)"""
+        return N.uint8(matrix*255)
+
+    def saveQuantizedImage(self, matrix, path):
+        """saveQuantizedImage(numpy.array matrix, str path)"""
+        outputImage = img.fromarray(matrix)
+        outputImage.save(path)
+
+    def binarizeMatrix(self, matrix, threshold):
+        """numpy.array binarizeMatrix(numpy.array matrix, float threshold)"""
+        binarizedMatrix = N.zeros_like(matrix)
+        binarizedMatrix[N.where(matrix > threshold)] = 1.
+        binarizedMatrix[N.where(matrix <= threshold)] = 0.
+        return N.copy(binarizedMatrix)
+
+    def getRelevantRegion(self, imageMatrix, weight = 5., threshold = 0.4):
+        """numpy.array getRelevantRegion(numpy.array imageMatrix, float weight, float threshold)"""
+        startTime = pt.profiler.start()
+        regionProfile = N.max(self.getRegionMatrix(imageMatrix, weight), axis = 1)
+        limit = self.getRegionLimits(regionProfile, threshold)
+        pt.profiler.stop('getRelevantRegion', startTime)
+        return limit
+
+    def getRegionMatrix(self, imageMatrix, weight = 5.):
+        """numpy.array getRegionMatrix(numpy.array imageMatrix[, float weight = 5.])"""
+        mathTools = mt.MathTools()
+        regionMatrix = N.copy(imageMatrix)
+        regionMatrix = mathTools.gaussianFilter(regionMatrix, weight)
+        regionMatrix = mathTools.gradient(regionMatrix)
+        return mathTools.normalize(regionMatrix)
+
+    def getRegionMargin(self, weight = 5.):
+        """int getRegionMargin([float weight = 5.])"""
+        # Gaussian Truncation Radius (SciPy Default of 4 Deviations) plus the Gradient Neighbour
+        return int(4. * weight + 0.5) + 1
+
+    def getRegionLimits(self, regionProfile, threshold = 0.4):
+        """numpy.array getRegionLimits(numpy.array regionProfile[, float threshold = 0.4])"""
+        rows = N.where(regionProfile / N.max(regionProfile) > threshold)[0]
+        return N.array([rows[0], rows[-1]])
+
+    def selectLayers(self, matrix, count):
+        """numpy.array selectLayers(numpy.array matrix, int count)"""
+        metricTools = mtr.MetricTools()
+        return metricTools.selectLayers(matrix, count)
\ No newline at end of file
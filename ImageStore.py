@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import glob
+import json
+import numpy as N
+import os.path as P
+from PIL import Image as img
+
+class ImageStore(object):
+    """Memory-Mapped Grayscale Image Store"""
+
+    def __init__(self, directory = 'images', storePath = None):
+        # Settings
+        self.directory = directory
+        self.storePath = storePath if storePath is not None else P.join(directory, 'images.u8')
+        self.indexPath = self.storePath + '.json'
+        # Mapped Store
+        self.memoryMap = None
+        self.entries   = {}
+
+    def getImageFiles(self):
+        """list getImageFiles()"""
+        files = []
+        for path in glob.glob(P.join(self.directory, 'Subject*_*.png')):
+            match = re.match(r'Subject(\d+)_(\d+)\.png$', P.basename(path))
+            if (match is not None):
+                files.append((int(match.group(1)), int(match.group(2)), path))
+        return sorted(files)
+
+    def loadIndex(self):
+        """dict loadIndex()"""
+        if (not P.isfile(self.indexPath) or not P.isfile(self.storePath)):
+            return None
+        try:
+            data = open(self.indexPath)
+            try:
+                return json.load(data)
+            finally:
+                data.close()
+        except (IOError, ValueError):
+            return None
+
+    def isCurrent(self, index):
+        """bool isCurrent(dict index)"""
+        if (index is None):
+            return False
+        stored  = [(entry['name'], entry['mtime']) for entry in index['entries']]
+        current = [(P.basename(path), P.getmtime(path)) for _, _, path in self.getImageFiles()]
+        return stored == current
+
+    def ingest(self):
+        """dict ingest()"""
+        entries = []
+        offset  = 0
+        temporaryPath = self.storePath + '.' + str(os.getpid()) + '.tmp'
+        data = open(temporaryPath, 'wb')
+        for subject, imageNumber, path in self.getImageFiles():
+            imageMatrix = N.ascontiguousarray(N.array(img.open(path).convert('L'), dtype = N.uint8))
+            data.write(imageMatrix.tobytes())
+            entry = {}
+            entry['name']    = P.basename(path)
+            entry['subject'] = subject
+            entry['image']   = imageNumber
+            entry['shape']   = list(imageMatrix.shape)
+            entry['offset']  = offset
+            entry['mtime']   = P.getmtime(path)
+            entries.append(entry)
+            offset += imageMatrix.size
+        data.close()
+        index = { 'entries': entries, 'size': offset }
+
+        # Store First, Then the Index that Validates It
+        os.rename(temporaryPath, self.storePath)
+        temporaryPath = self.indexPath + '.' + str(os.getpid()) + '.tmp'
+        data = open(temporaryPath, 'w')
+        json.dump(index, data)
+        data.close()
+        os.rename(temporaryPath, self.indexPath)
+        return index
+
+    def open(self):
+        """ImageStore open()"""
+        index = self.loadIndex()
+        if (not self.isCurrent(index)):
+            index = self.ingest()
+        self.entries = {}
+        for entry in index['entries']:
+            self.entries[(entry['subject'], entry['image'])] = entry
+        if (index['size'] > 0):
+            self.memoryMap = N.memmap(self.storePath, dtype = N.uint8, mode = 'r', shape = (index['size'],))
+        return self
+
+    def getEntry(self, subject, imageNumber):
+        """dict getEntry(int subject, int imageNumber)"""
+        if (self.memoryMap is None):
+            self.open()
+        if ((subject, imageNumber) not in self.entries):
+            raise KeyError('Image not in store: Subject' + str(subject) + '_' + str(imageNumber))
+        return self.entries[(subject, imageNumber)]
+
+    def getMatrix(self, subject, imageNumber):
+        """numpy.array getMatrix(int subject, int imageNumber)"""
+        entry = self.getEntry(subject, imageNumber)
+        height, width = entry['shape']
+        return self.memoryMap[entry['offset']: entry['offset'] + height * width].reshape(height, width)
+
+    def getVolume(self, subject, imageNumbers):
+        """numpy.array getVolume(int subject, list imageNumbers)"""
+        entries = [self.getEntry(subject, imageNumber) for imageNumber in imageNumbers]
+        height, width = entries[0]['shape']
+        size = height * width
+
+        # Consecutive Slices Map to One Zero-Copy Block
+        contiguous = True
+        for i in xrange(len(entries)):
+            if (entries[i]['shape'] != [height, width] or entries[i]['offset'] != entries[0]['offset'] + i * size):
+                contiguous = False
+        if (contiguous):
+            start = entries[0]['offset']
+            return self.memoryMap[start: start + len(entries) * size].reshape(len(entries), height, width)
+        return N.array([self.getMatrix(subject, imageNumber) for imageNumber in imageNumbers])
+
+    def getGrayscaleMatrix(self, subject, imageNumber, dtype = float):
+        """numpy.array getGrayscaleMatrix(int subject, int imageNumber[, type dtype = float])"""
+        return N.array(self.getMatrix(subject, imageNumber), dtype = dtype) / N.dtype(dtype).type(255.)
+
+    def getGrayscaleVolume(self, subject, imageNumbers, dtype = float):
+        """numpy.array getGrayscaleVolume(int subject, list imageNumbers[, type dtype = float])"""
+        return N.array(self.getVolume(subject, imageNumbers), dtype = dtype) / N.dtype(dtype).type(255.)
\ No newline at end of file
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import numpy as N
+
+try:
+    import numba as nb
+except ImportError:
+    nb = None
+
+def colonyKernel(pheromoneMatrix, traceMatrix, heuristicStack, startRows, antCount, directionLookup, cycleCount, rho, psi, seed, traceIncrement):
+    """colonyKernel(numpy.array pheromoneMatrix, numpy.array traceMatrix, numpy.array heuristicStack,
+    numpy.array startRows, int antCount, numpy.array directionLookup, int cycleCount, float rho, float psi, int seed,
+    number traceIncrement)"""
+
+    # Kernel Random Generator
+    N.random.seed(seed)
+
+    # Image Dimensions
+    matrixHeight = pheromoneMatrix.shape[0]
+    matrixWidth  = pheromoneMatrix.shape[1]
+    stepCount = matrixWidth - 1
+
+    # Ant Starting Search Space
+    antSet = startRows.copy()
+
+    # For Each Cycle
+    for cycle in range(cycleCount):
+
+        # Random Ant Distribution
+        N.random.shuffle(antSet)
+
+        # For Each Ant
+        for i in range(antCount):
+
+            # Starting Position
+            x = antSet[i]
+
+            # For Each Step
+            for step in range(stepCount):
+
+                # Destination Column
+                y = step + 1
+
+                # Pheromone Window
+                u = min(max(0, x - 1), matrixHeight - 1)
+                v = min(max(0, x + 1), matrixHeight - 1)
+                total = 0.
+                for r in range(u, v + 1):
+                    total += pheromoneMatrix[r, y]
+
+                # Weighted Random Ant Direction
+                draw = N.random.random() * total
+                destinationIndex = 0
+                cumulative = pheromoneMatrix[u, y]
+                while (draw >= cumulative and destinationIndex < v - u):
+                    destinationIndex += 1
+                    cumulative += pheromoneMatrix[u + destinationIndex, y]
+
+                # Update Ant Position
+                x = min(max(0, x + destinationIndex - 1), matrixHeight - 1)
+
+                # Local Pheromone Update
+                directionIndex = directionLookup[destinationIndex]
+                pheromoneMatrix[x, y] += rho * heuristicStack[directionIndex, x, y]
+
+                # Trace Matrix Update
+                traceMatrix[x, y] += traceIncrement
+
+        # Global Pheromone Update
+        pheromoneMatrix *= (1 - psi)
+
+def pathKernel(scoreMatrix, smoothness, path):
+    """pathKernel(numpy.array scoreMatrix, float smoothness, numpy.array path)"""
+
+    # Image Dimensions
+    matrixHeight = scoreMatrix.shape[0]
+    matrixWidth  = scoreMatrix.shape[1]
+
+    # Path Totals and Back Pointers
+    totals   = scoreMatrix[:, 0].copy()
+    previous = totals.copy()
+    backPointers = N.zeros((matrixWidth, matrixHeight), dtype = N.int8)
+
+    # Forward Pass (Row Moves by at Most One per Column)
+    for y in range(1, matrixWidth):
+        for x in range(matrixHeight):
+            previous[x] = totals[x]
+        for x in range(matrixHeight):
+            best = -N.inf
+            if (x > 0):
+                best = previous[x - 1] - smoothness
+            move = 0
+            if (previous[x] > best):
+                best = previous[x]
+                move = 1
+            if (x < matrixHeight - 1 and previous[x + 1] - smoothness > best):
+                best = previous[x + 1] - smoothness
+                move = 2
+            backPointers[y, x] = move
+            totals[x] = best + scoreMatrix[x, y]
+
+    # Backtrack Best Path
+    path[matrixWidth - 1] = N.argmax(totals)
+    for y in range(matrixWidth - 1, 0, -1):
+        path[y - 1] = path[y] + backPointers[y, path[y]] - 1
+
+if (nb is not None):
+    compiledColonyKernel = nb.njit(cache = True, nogil = True)(colonyKernel)
+    compiledPathKernel   = nb.njit(cache = True, nogil = True)(pathKernel)
+else:
+    compiledColonyKernel = None
+    compiledPathKernel   = None
+
+class KernelTools(object):
+    """Compiled Colony Kernels"""
+
+    def isCompiled(self):
+        """bool isCompiled()"""
+        return compiledColonyKernel is not None
+
+    def walkColony(self, pheromoneMatrix, traceMatrix, heuristicStack, startRows, antCount, directionLookup, cycleCount, rho, psi, seed,
+                   traceIncrement = 0.01):
+        """walkColony(numpy.array pheromoneMatrix, numpy.array traceMatrix, numpy.array heuristicStack,
+        numpy.array startRows, int antCount, numpy.array directionLookup, int cycleCount, float rho, float psi, int seed[,
+        number traceIncrement = 0.01])"""
+        compiledColonyKernel(pheromoneMatrix, traceMatrix,
+                             N.ascontiguousarray(heuristicStack),
+                             N.ascontiguousarray(startRows, dtype = N.int64), int(antCount),
+                             N.ascontiguousarray(directionLookup, dtype = N.int64),
+                             int(cycleCount), float(rho), float(psi), int(seed), traceMatrix.dtype.type(traceIncrement))
+
+    def findPath(self, scoreMatrix, smoothness = 0.):
+        """numpy.array findPath(numpy.array scoreMatrix[, float smoothness = 0.])"""
+        path = N.empty(scoreMatrix.shape[1], dtype = N.int64)
+        compiledPathKernel(N.ascontiguousarray(scoreMatrix, dtype = float), float(smoothness), path)
+        return path
\ No newline at end of file
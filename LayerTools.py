@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import numpy as N
+
+import KernelTools as kt
+import ProfileTools as pt
+
+class LayerTools(object):
+    """Ordered Layer Path Extraction"""
+
+    def __init__(self):
+        # Toolboxes
+        self.kernelTools = kt.KernelTools()
+
+    def getScoreMatrix(self, traceMatrix, pheromoneMatrix = None, weight = 0.5, gamma = 0.5):
+        """numpy.array getScoreMatrix(numpy.array traceMatrix[, numpy.array pheromoneMatrix = None,
+        float weight = 0.5, float gamma = 0.5])"""
+        scoreMatrix = N.array(traceMatrix, dtype = float)
+        scoreMatrix /= max(N.max(scoreMatrix), 1e-12)
+        if (pheromoneMatrix is not None):
+            scoreMatrix *= 1. - weight
+            scoreMatrix += weight * pheromoneMatrix / max(N.max(pheromoneMatrix), 1e-12)
+        return N.power(scoreMatrix, gamma, out = scoreMatrix)
+
+    def findPath(self, scoreMatrix, smoothness = 0.):
+        """numpy.array findPath(numpy.array scoreMatrix[, float smoothness = 0.])"""
+        height  = scoreMatrix.shape[0]
+        width   = scoreMatrix.shape[1]
+        columns = N.ascontiguousarray(scoreMatrix.T)
+
+        # Path Totals with Unreachable Border Rows
+        padded = N.full(height + 2, -N.inf)
+        padded[1: -1] = columns[0]
+        totals = padded[1: -1]
+        upper  = padded[0: -2]
+        lower  = padded[2:]
+
+        # Forward Pass (Row Moves by at Most One per Column)
+        best      = N.empty(height)
+        candidate = N.empty(height)
+        fromSame  = N.empty(height, dtype = bool)
+        fromLower = N.empty(height, dtype = bool)
+        backPointers = N.empty((width, height), dtype = N.int8)
+        for column in xrange(1, width):
+            N.subtract(upper, smoothness, out = best)
+            N.greater(totals, best, out = fromSame)
+            N.maximum(totals, best, out = best)
+            N.subtract(lower, smoothness, out = candidate)
+            N.greater(candidate, best, out = fromLower)
+            N.maximum(candidate, best, out = best)
+            backPointers[column] = N.where(fromLower, 2, fromSame)
+            N.add(best, columns[column], out = totals)
+
+        # Backtrack Best Path
+        path = N.empty(width, dtype = int)
+        path[-1] = N.argmax(totals)
+        for column in xrange(width - 1, 0, -1):
+            path[column - 1] = path[column] + backPointers[column, path[column]] - 1
+        return path
+
+    def refineLayers(self, scoreMatrix, layers, gap = 1, smoothness = 0., sweeps = 4, findPath = None):
+        """numpy.array refineLayers(numpy.array scoreMatrix, numpy.array layers[, int gap = 1, float smoothness = 0.,
+        int sweeps = 4, function findPath = None])"""
+        if (findPath is None):
+            findPath = self.findPath
+        height  = scoreMatrix.shape[0]
+        width   = scoreMatrix.shape[1]
+        rows    = N.arange(height)[:, None]
+        columns = N.arange(width)
+        count   = layers.shape[0]
+
+        # Ordered Joint Search by Block Coordinate Ascent (Each Layer Between Its Neighbours)
+        for _ in xrange(sweeps):
+            moved = 0
+            for l in xrange(count):
+                lower = layers[l - 1] + gap if l > 0 else N.zeros(width, dtype = int)
+                upper = layers[l + 1] - gap if l < count - 1 else N.full(width, height - 1, dtype = int)
+                bandMatrix = N.where((rows >= lower[None, :]) & (rows <= upper[None, :]), scoreMatrix, -N.inf)
+                path = findPath(bandMatrix, smoothness)
+
+                # Keep the Layer When No Connected Path Fits the Band
+                if (N.all(N.isfinite(bandMatrix[path, columns]))):
+                    moved += N.count_nonzero(path != layers[l])
+                    layers[l] = path
+            if (moved == 0):
+                break
+        return layers
+
+    def extractLayers(self, traceMatrix, count = 8, pheromoneMatrix = None, weight = 0.5, gamma = 0.5, gap = 1,
+                      smoothness = 0.2, penalty = 1e3, backend = 'numpy', sweeps = 4):
+        """numpy.array extractLayers(numpy.array traceMatrix[, int count = 8, numpy.array pheromoneMatrix = None,
+        float weight = 0.5, float gamma = 0.5, int gap = 1, float smoothness = 0.2, float penalty = 1e3,
+        str backend = 'numpy', int sweeps = 4])"""
+        startTime = pt.profiler.start()
+
+        # Path Search (Compiled Backend Falls Back to NumPy When Unavailable)
+        if (backend not in ('numpy', 'numba')):
+            raise ValueError('Unknown layer backend: ' + str(backend))
+        findPath = self.findPath
+        if (backend == 'numba' and self.kernelTools.isCompiled()):
+            findPath = self.kernelTools.findPath
+
+        scoreMatrix = self.getScoreMatrix(traceMatrix, pheromoneMatrix, weight, gamma)
+        rows = N.arange(scoreMatrix.shape[0])[:, None]
+
+        # Initial Paths: Strongest First, Each Excluding a Band Around the Previous Ones
+        bandedMatrix = N.copy(scoreMatrix)
+        layers = N.empty((count, scoreMatrix.shape[1]), dtype = int)
+        for l in xrange(count):
+            layers[l] = findPath(bandedMatrix, smoothness)
+            bandedMatrix[N.abs(rows - layers[l][None, :]) <= gap] -= penalty
+
+        # Top-to-Bottom Order, Then Joint Refinement Keeping Order and Separation
+        layers.sort(axis = 0)
+        layers = self.refineLayers(scoreMatrix, layers, gap, smoothness, sweeps, findPath)
+        pt.profiler.stop('extractLayers', startTime)
+        return layers.astype(float)
\ No newline at end of file
@@ -1,75 +1,129 @@
-# -*- coding: utf-8 -*-
-
-import numpy as N
-import scipy.signal as sig
-import scipy.ndimage.filters as flt
-import cv2 as cv
-
-class MathTools(object):
-    """Mathematical Toolset"""
-
-    def gradient(self, inputMatrix, diagonal = False, horizontalWeight = 1., verticalWeight = 1.):
-        """numpy.array gradient(numpy.array inputMatrix[, bool diagonal = False,
-        float horizontalWeight = 1., float verticalWeight = 1.])"""
-        if (not diagonal):
-            horizontalMask = N.array([[0, 0, 0], [-1, 0, 1], [0, 0, 0]])*horizontalWeight
-            verticalMask = N.array([[0, -1, 0], [0, 0, 0], [0, 1, 0]])*verticalWeight
-        else:
-            horizontalMask = N.array([[0, 0, 1], [0, 0, 0], [-1, 0, 0]])*horizontalWeight
-            verticalMask = N.array([[-1, 0, 0], [0, 0, 0], [0, 0, 1]])*verticalWeight
-        horizontalMatrix = self.convolve(inputMatrix, horizontalMask)
-        verticalMatrix = self.convolve(inputMatrix, verticalMask)
-        gradientMatrix = N.sqrt(N.square(horizontalMatrix) + N.square(verticalMatrix))
-        return gradientMatrix
-    
-    def directionalGradient(self, inputMatrix, directionIndex, thickness = 1):
-        """numpy.array directionalGradient(numpy.array inputMatrix, int directionIndex, int thickness)"""
-        diameter = 2 * thickness + 1
-        maskArray = N.ones(diameter)
-        maskArray[thickness] = 0
-        maskArray[thickness + 1:] = -N.ones(thickness)
-        maskArray /= N.float(thickness)
-        if (directionIndex == 1 or directionIndex == 3):
-            mask = N.diag(maskArray)
-            if (directionIndex == 3):
-                mask = N.fliplr(mask)
-        elif (directionIndex == 0 or directionIndex == 2):
-            mask = N.zeros((diameter, diameter))
-            mask[thickness] = maskArray
-            if (directionIndex == 0):
-                mask = mask.T
-        else:
-            mask = N.ones((diameter, diameter)) / N.float(N.square(diameter))
-        gradientMatrix = N.abs(self.convolve(inputMatrix, mask))
-        return gradientMatrix
-
-    def gaussianFilter(self, inputMatrix, standardDeviation = 2.):
-        """numpy.array gaussianFilter(numpy.array inputMatrix[, float standardDeviation = 2.])"""
-        return flt.gaussian_filter(inputMatrix, standardDeviation)
-    
-    def medianFilter(self, inputMatrix, diameter = 11):
-        """numpy.array medianFilter(numpy.array inputMatrix[, int diameter = 11])"""
-        return flt.median_filter(inputMatrix, diameter)
-
-    def bilateralFilter(self, inputMatrix, iterations = 3, diameter = 10, sigma = 15.):
-        """numpy.array bilateralFilter(numpy.array inputMatrix[, int iterations = 3, int diameter = 10, float sigma = 15.])"""
-        filteredMatrix = N.uint8(inputMatrix * 255.)
-        for _ in xrange(iterations):
-            filteredMatrix = cv.bilateralFilter(filteredMatrix, diameter, sigma, sigma)
-        return filteredMatrix / 255.
-
-    def normalize(self, inputMatrix):
-        """numpy.array normalize(numpy.array inputMatrix)"""
-        normalizedMatrix = N.copy(inputMatrix)
-        normalizedMatrix[N.where(inputMatrix < 0.)] = 0.
-        normalizedMatrix[N.where(inputMatrix > 1.)] = 1.
-        return normalizedMatrix
-
-    def convolve(self, matrix, mask):
-        """numpy.array convolve(numpy.array matrix, numpy.array mask)"""
-        return sig.convolve2d(matrix, mask, 'same', 'symm')
-
-    def clamp(self, value, boundary):
-        """int clamp(int value, int boundary)"""
-        value = min(max(0, value), boundary)
+# -*- coding: utf-8 -*-
+
+import numpy as N
+import scipy.signal as sig
+import scipy.ndimage.filters as flt
+import cv2 as cv
+
+import ProfileTools as pt
+
+class MathTools(object):
+    """Mathematical Toolset"""
+
+    def padSymmetric(self, inputMatrix, dtype = float):
+        """numpy.array padSymmetric(numpy.array inputMatrix[, type dtype = float])"""
+        return N.pad(N.asarray(inputMatrix, dtype = dtype), 1, 'symmetric')
+
+    def shift(self, paddedMatrix, dx, dy):
+        """numpy.array shift(numpy.array paddedMatrix, int dx, int dy)"""
+        height = paddedMatrix.shape[0] - 2
+        width  = paddedMatrix.shape[1] - 2
+        return paddedMatrix[1 + dx: 1 + dx + height, 1 + dy: 1 + dy + width]
+
+    def gradient(self, inputMatrix, diagonal = False, horizontalWeight = 1., verticalWeight = 1.):
+        """numpy.array gradient(numpy.array inputMatrix[, bool diagonal = False,
+        float horizontalWeight = 1., float verticalWeight = 1.])"""
+        paddedMatrix = self.padSymmetric(inputMatrix)
+        if (not diagonal):
+            horizontalMatrix = self.shift(paddedMatrix, 0, -1) - self.shift(paddedMatrix, 0, 1)
+            verticalMatrix   = self.shift(paddedMatrix, -1, 0) - self.shift(paddedMatrix, 1, 0)
+        else:
+            horizontalMatrix = self.shift(paddedMatrix, 1, -1) - self.shift(paddedMatrix, -1, 1)
+            verticalMatrix   = self.shift(paddedMatrix, -1, -1) - self.shift(paddedMatrix, 1, 1)
+        horizontalMatrix *= horizontalWeight
+        verticalMatrix   *= verticalWeight
+        gradientMatrix = N.sqrt(N.square(horizontalMatrix) + N.square(verticalMatrix))
+        return gradientMatrix
+
+    def gradientStack(self, inputMatrix, out = None, magnitude = None, dtype = N.float32):
+        """tuple gradientStack(numpy.array inputMatrix[, numpy.array out = None,
+        numpy.array magnitude = None, type dtype = numpy.float32])"""
+        startTime = pt.profiler.start()
+        height = inputMatrix.shape[0]
+        width  = inputMatrix.shape[1]
+        if (out is None):
+            out = N.empty((4, height, width), dtype = dtype)
+        if (magnitude is None):
+            magnitude = N.empty((height, width), dtype = out.dtype)
+
+        # Single Symmetric Padding
+        paddedMatrix = self.padSymmetric(inputMatrix, out.dtype)
+
+        # Directional Responses (directionalGradient Masks, Thickness 1)
+        N.subtract(self.shift(paddedMatrix,  1, 0), self.shift(paddedMatrix, -1,  0), out = out[0])
+        N.subtract(self.shift(paddedMatrix,  1, 1), self.shift(paddedMatrix, -1, -1), out = out[1])
+        N.subtract(self.shift(paddedMatrix,  0, 1), self.shift(paddedMatrix,  0, -1), out = out[2])
+        N.subtract(self.shift(paddedMatrix, 1, -1), self.shift(paddedMatrix, -1,  1), out = out[3])
+        N.abs(out, out = out)
+
+        # Gradient Magnitude from the Axis Responses
+        N.hypot(out[0], out[2], out = magnitude)
+        pt.profiler.stop('gradientStack', startTime)
+        return out, magnitude
+
+    def directionalGradient(self, inputMatrix, directionIndex, thickness = 1):
+        """numpy.array directionalGradient(numpy.array inputMatrix, int directionIndex, int thickness)"""
+        startTime = pt.profiler.start()
+        diameter = 2 * thickness + 1
+        maskArray = N.ones(diameter)
+        maskArray[thickness] = 0
+        maskArray[thickness + 1:] = -N.ones(thickness)
+        maskArray /= N.float(thickness)
+        if (directionIndex == 1 or directionIndex == 3):
+            mask = N.diag(maskArray)
+            if (directionIndex == 3):
+                mask = N.fliplr(mask)
+        elif (directionIndex == 0 or directionIndex == 2):
+            mask = N.zeros((diameter, diameter))
+            mask[thickness] = maskArray
+            if (directionIndex == 0):
+                mask = mask.T
+        else:
+            mask = N.ones((diameter, diameter)) / N.float(N.square(diameter))
+        gradientMatrix = N.abs(self.convolve(inputMatrix, mask))
+        pt.profiler.stop('directionalGradient' + str(directionIndex), startTime)
+        return gradientMatrix
+
+    def gaussianFilter(self, inputMatrix, standardDeviation = 2.):
+        """numpy.array gaussianFilter(numpy.array inputMatrix[, float standardDeviation = 2.])"""
+        return flt.gaussian_filter(inputMatrix, standardDeviation)
+    
+    def medianFilter(self, inputMatrix, diameter = 11):
+        """numpy.array medianFilter(numpy.array inputMatrix[, int diameter = 11])"""
+        startTime = pt.profiler.start()
+        filteredMatrix = flt.median_filter(inputMatrix, diameter)
+        pt.profiler.stop('medianFilter', startTime)
+        return filteredMatrix
+
+    def bilateralFilter(self, inputMatrix, iterations = 3, diameter = 10, sigma = 15.):
+        """numpy.array bilateralFilter(numpy.array inputMatrix[, int iterations = 3, int diameter = 10, float sigma = 15.])"""
+        startTime = pt.profiler.start()
+        filteredMatrix = N.uint8(inputMatrix * 255.)
+        for _ in xrange(iterations):
+            filteredMatrix = cv.bilateralFilter(filteredMatrix, diameter, sigma, sigma)
+        pt.profiler.stop('bilateralFilter', startTime)
+        return filteredMatrix / 255.
+
+    def resize(self, inputMatrix, shape):
+        """numpy.array resize(numpy.array inputMatrix, tuple shape)"""
+        if (shape[0] < inputMatrix.shape[0]):
+            interpolation = cv.INTER_AREA
+        else:
+            interpolation = cv.INTER_LINEAR
+        return cv.resize(inputMatrix, (shape[1], shape[0]), interpolation = interpolation)
+
+    def normalize(self, inputMatrix):
+        """numpy.array normalize(numpy.array inputMatrix)"""
+        normalizedMatrix = N.copy(inputMatrix)
+        normalizedMatrix[N.where(inputMatrix < 0.)] = 0.
+        normalizedMatrix[N.where(inputMatrix > 1.)] = 1.
+        return normalizedMatrix
+
+    def convolve(self, matrix, mask):
+        """numpy.array convolve(numpy.array matrix, numpy.array mask)"""
+        return sig.convolve2d(matrix, mask, 'same', 'symm')
+
+    def clamp(self, value, boundary):
+        """int clamp(int value, int boundary)"""
+        value = min(max(0, value), boundary)
         return value
\ No newline at end of file
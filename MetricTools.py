@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import numpy as N
+
+import ProfileTools as pt
+
+class MetricTools(object):
+    """Vectorised Segmentation Metrics"""
+
+    def selectLayers(self, matrix, count):
+        """numpy.array selectLayers(numpy.array matrix, int count)"""
+        startTime = pt.profiler.start()
+        resultMatrix = N.zeros_like(matrix)
+        height = matrix.shape[0]
+
+        # Per-Column Threshold (count-th Largest Value)
+        threshold = N.partition(matrix, height - count, axis = 0)[height - count]
+        above = matrix > threshold
+        equal = matrix == threshold
+
+        # Columns Whose Top Set is Unique
+        needed = count - N.sum(above, axis = 0)
+        ambiguous = N.sum(equal, axis = 0) > needed
+        resultMatrix[above] = 1.0
+        resultMatrix[equal & ~ambiguous] = 1.0
+
+        # Ties Across the Threshold Follow argsort Order
+        columns = N.where(ambiguous)[0]
+        if (len(columns) > 0):
+            resultMatrix[:, columns] = 0.0
+            indexes = N.argsort(matrix[:, columns], axis = 0)[-count:]
+            resultMatrix[indexes, columns] = 1.0
+        pt.profiler.stop('selectLayers', startTime)
+        return resultMatrix
+
+    def getTruthMatrix(self, truthLayers, matrixShape):
+        """numpy.array getTruthMatrix(numpy.array truthLayers, tuple matrixShape)"""
+        truthMatrix = N.zeros(matrixShape)
+        columns = N.arange(truthLayers.shape[1])
+        truthMatrix[truthLayers.astype(int), columns] = 1
+        return truthMatrix
+
+    def getAccuracy(self, layerMatrix, truthMatrix):
+        """dict getAccuracy(numpy.array layerMatrix, numpy.array truthMatrix)"""
+        startTime = pt.profiler.start()
+        truth = (truthMatrix == 1)
+        layer = (layerMatrix == 1)
+        tp = int(N.count_nonzero(truth & layer))
+        fn = int(N.count_nonzero(truth & (layerMatrix == 0)))
+        fp = int(N.count_nonzero((truthMatrix == 0) & layer))
+        acc = float(tp) / float(tp + fp + fn)
+        pt.profiler.stop('getAccuracy', startTime)
+        return { 'tp': tp, 'fp': fp, 'fn': fn, 'acc': acc }
+
+    def getCoverage(self, layerMatrix, truthLayers):
+        """numpy.array getCoverage(numpy.array layerMatrix, numpy.array truthLayers)"""
+        startTime = pt.profiler.start()
+        layers = truthLayers.shape[0]
+        width  = truthLayers.shape[1]
+        result = N.zeros(layers + 1).T
+        result[layers] = width
+        columns = N.arange(width)
+        hits = (layerMatrix[truthLayers.astype(int), columns] == 1)
+        result[0: layers] = N.sum(hits, axis = 1)
+        pt.profiler.stop('getCoverage', startTime)
+        return result
\ No newline at end of file
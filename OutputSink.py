@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import Queue
+import threading
+import collections
+import numpy as N
+import os.path as P
+
+import ImageHandler as ih
+
+class OutputSink(object):
+    """Background Output Image Writer"""
+
+    def __init__(self, directory, mode = 'png', workers = 2, queueSize = 16, groupLimit = 2):
+        # Settings
+        self.directory  = directory
+        self.mode       = mode
+        self.workers    = workers
+        self.groupLimit = groupLimit
+        if (mode not in ('png', 'npz')):
+            raise ValueError('Unknown output mode: ' + str(mode))
+        # Buffers
+        self.imageHandler = ih.ImageHandler()
+        self.queue    = Queue.Queue(queueSize)
+        self.groups   = collections.OrderedDict()
+        self.deferred = []
+        self.errors   = []
+        # Entry Tickets Not Yet on Disk and Callbacks Waiting on Them
+        self.sequence    = 0
+        self.outstanding = set()
+        self.tickets     = {}
+        self.callbacks   = []
+        self.lock     = threading.Lock()
+        self.archiveLock = threading.Lock()
+        # Writer Threads (No Workers Defers Entries to the Caller)
+        self.threads = []
+        for _ in xrange(workers):
+            thread = threading.Thread(target = self.consume)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+        if (not P.isdir(directory)):
+            os.makedirs(directory)
+
+    def write(self, group, name, matrix, quantized = False):
+        """write(str group, str name, numpy.array matrix[, bool quantized = False])"""
+        self.check()
+        if (self.workers == 0):
+            if (not quantized):
+                matrix = self.imageHandler.quantizeMatrix(matrix)
+            self.deferred.append((group, name, matrix, True))
+        else:
+            with self.lock:
+                ticket = self.sequence
+                self.sequence += 1
+                self.outstanding.add(ticket)
+            self.queue.put(('image', group, name, matrix, quantized, ticket))
+
+    def whenWritten(self, function, *arguments):
+        """whenWritten(function function, ...)"""
+        # Runs from poll() Once Every Entry Written So Far is on Disk
+        with self.lock:
+            self.callbacks.append((self.sequence, function, arguments))
+        self.poll()
+
+    def poll(self):
+        """poll()"""
+        with self.lock:
+            lowest = min(self.outstanding) if self.outstanding else self.sequence
+            ready = [callback for callback in self.callbacks if callback[0] <= lowest]
+            self.callbacks = [callback for callback in self.callbacks if callback[0] > lowest]
+        for _, function, arguments in ready:
+            function(*arguments)
+
+    def release(self, tickets):
+        """release(list tickets)"""
+        with self.lock:
+            self.outstanding.difference_update(tickets)
+
+    def drain(self):
+        """list drain()"""
+        entries = self.deferred
+        self.deferred = []
+        return entries
+
+    def consume(self):
+        """consume()"""
+        while (True):
+            task = self.queue.get()
+            try:
+                if (task is None):
+                    return
+                if (task[0] == 'image'):
+                    self.writeImage(*task[1:])
+                else:
+                    self.writeArchive(*task[1:])
+            except Exception:
+                with self.lock:
+                    self.errors.append(sys.exc_info())
+            finally:
+                self.queue.task_done()
+
+    def writeImage(self, group, name, matrix, quantized, ticket):
+        """writeImage(str group, str name, numpy.array matrix, bool quantized, int ticket)"""
+        if (not quantized):
+            matrix = self.imageHandler.quantizeMatrix(matrix)
+        if (self.mode == 'png'):
+            self.imageHandler.saveQuantizedImage(matrix, P.join(self.directory, name + '.png'))
+            self.release([ticket])
+            return
+
+        # Buffer Archive Entries (Oldest Group is Written Past the Limit)
+        evicted = []
+        with self.lock:
+            if (group not in self.groups):
+                self.groups[group]  = {}
+                self.tickets[group] = []
+            self.groups[group][name] = matrix
+            self.tickets[group].append(ticket)
+            while (len(self.groups) > self.groupLimit):
+                evictedGroup, entries = self.groups.popitem(last = False)
+                evicted.append((evictedGroup, entries, self.tickets.pop(evictedGroup)))
+        for evictedGroup, entries, tickets in evicted:
+            self.writeArchive(evictedGroup, entries, tickets)
+
+    def getArchivePath(self, group):
+        """str getArchivePath(str group)"""
+        return P.join(self.directory, group + '.npz')
+
+    def writeArchive(self, group, entries, tickets):
+        """writeArchive(str group, dict entries, list tickets)"""
+        path = self.getArchivePath(group)
+        with self.archiveLock:
+
+            # Merge with Entries Written Earlier
+            if (P.isfile(path)):
+                data = N.load(path)
+                try:
+                    merged = dict((name, data[name]) for name in data.files)
+                finally:
+                    data.close()
+                merged.update(entries)
+                entries = merged
+
+            # Atomic Compressed Archive
+            temporaryPath = path + '.' + str(os.getpid()) + '.tmp'
+            data = open(temporaryPath, 'wb')
+            N.savez_compressed(data, **entries)
+            data.close()
+            os.rename(temporaryPath, path)
+        self.release(tickets)
+
+    def check(self):
+        """check()"""
+        with self.lock:
+            if (not self.errors):
+                return
+            errorType, error, trace = self.errors.pop(0)
+        raise errorType, error, trace
+
+    def flush(self):
+        """flush()"""
+        self.queue.join()
+        with self.lock:
+            groups = [(group, entries, self.tickets.pop(group)) for group, entries in self.groups.items()]
+            self.groups.clear()
+        for group, entries, tickets in groups:
+            self.queue.put(('archive', group, entries, tickets))
+        self.queue.join()
+        self.check()
+        self.poll()
+
+    def close(self):
+        """close()"""
+        try:
+            self.flush()
+        finally:
+            for _ in self.threads:
+                self.queue.put(None)
+            for thread in self.threads:
+                thread.join()
+            self.threads = []
\ No newline at end of file
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+class Profiler(object):
+    """Stage Timers and Counters"""
+
+    def __init__(self, enabled = False, logPath = None):
+        # Settings
+        self.enabled = enabled
+        self.logPath = logPath
+        # Measurements
+        self.timers   = {}
+        self.calls    = {}
+        self.counters = {}
+
+    def reset(self):
+        """reset()"""
+        self.timers   = {}
+        self.calls    = {}
+        self.counters = {}
+
+    def start(self):
+        """float start()"""
+        if (not self.enabled):
+            return None
+        return time.time()
+
+    def stop(self, name, startTime):
+        """stop(str name, float startTime)"""
+        if (startTime is None):
+            return
+        self.timers[name] = self.timers.get(name, 0.) + (time.time() - startTime)
+        self.calls[name]  = self.calls.get(name, 0) + 1
+
+    def count(self, name, value = 1):
+        """count(str name[, int value = 1])"""
+        if (self.enabled):
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self):
+        """dict report()"""
+        stages = {}
+        for name in self.timers:
+            stages[name] = { 'seconds': self.timers[name], 'calls': self.calls[name] }
+        walkSeconds = self.timers.get('cycle', 0.) + self.timers.get('compiledWalk', 0.)
+        antSteps = self.counters.get('antSteps', 0)
+        result = {}
+        result['stages']   = stages
+        result['counters'] = dict(self.counters)
+        result['antStepsPerSecond'] = antSteps / walkSeconds if walkSeconds > 0. else 0.
+        return result
+
+    def log(self, record):
+        """log(dict record)"""
+        if (self.logPath is None):
+            return
+        data = open(self.logPath, 'a')
+        data.write(json.dumps(record) + '\n')
+        data.close()
+
+profiler = Profiler()
\ No newline at end of file
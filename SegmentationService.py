@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import glob
+import json
+import time
+import Queue
+import socket
+import shutil
+import argparse
+import threading
+import collections
+import numpy as N
+import os.path as P
+import multiprocessing as mp
+
+import ImageHandler as ih
+import AntColonyRacer as acr
+
+serviceState = {}
+
+class SegmentationService(object):
+    """Long-Lived Segmentation Worker Service"""
+
+    def __init__(self, outputDirectory, parameterSet, workers = 1, queueSize = 16, batchSize = 1,
+                 batchTimeout = 0.05):
+        # Settings
+        self.outputDirectory = outputDirectory
+        self.parameterSet    = parameterSet
+        self.workers         = workers
+        self.batchSize       = batchSize
+        self.batchTimeout    = batchTimeout
+        # Bounded Job Queue and In-Flight Batch Slots
+        self.queue   = Queue.Queue(queueSize)
+        self.slots   = threading.Semaphore(workers)
+        self.pending = {}
+        self.lock    = threading.Lock()
+        # Service State
+        self.pool      = None
+        self.threads   = []
+        self.stopEvent = threading.Event()
+        self.jobCount  = 0
+        self.startTime = None
+        # Metrics
+        self.submitted     = 0
+        self.completed     = 0
+        self.failed        = 0
+        self.maxQueueDepth = 0
+        self.latencies     = collections.deque(maxlen = 1024)
+        self.serviceTimes  = collections.deque(maxlen = 1024)
+        if (not P.isdir(outputDirectory)):
+            os.makedirs(outputDirectory)
+
+    def start(self):
+        """start()"""
+        self.startTime = time.time()
+        self.pool = mp.Pool(self.workers, initializeWorker)
+        self.startThread(self.dispatch)
+
+    def startThread(self, target, *arguments):
+        """startThread(function target, ...)"""
+        thread = threading.Thread(target = target, args = arguments)
+        thread.daemon = True
+        thread.start()
+        self.threads.append(thread)
+
+    def submit(self, path, source = 'api', block = True):
+        """int submit(str path[, str source = 'api', bool block = True])"""
+
+        # Job Record
+        with self.lock:
+            self.jobCount += 1
+            job = { 'id': self.jobCount, 'path': path, 'source': source, 'enqueued': time.time() }
+
+        # Bounded Put (Blocks Producers While the Queue is Full)
+        while (True):
+            try:
+                self.queue.put(job, True, 0.1)
+                break
+            except Queue.Full:
+                if (not block or self.stopEvent.is_set()):
+                    raise
+
+        # Queue Depth
+        with self.lock:
+            self.submitted += 1
+            self.maxQueueDepth = max(self.maxQueueDepth, self.queue.qsize())
+        return job['id']
+
+    def dispatch(self):
+        """dispatch()"""
+        while (not self.stopEvent.is_set() or not self.queue.empty()):
+
+            # First Job of the Batch
+            try:
+                batch = [self.queue.get(True, 0.1)]
+            except Queue.Empty:
+                continue
+
+            # Fill Batch Until Size or Timeout
+            deadline = time.time() + self.batchTimeout
+            while (len(batch) < self.batchSize):
+                try:
+                    batch.append(self.queue.get(True, max(0., deadline - time.time())))
+                except Queue.Empty:
+                    break
+
+            # Wait for a Free Worker Slot
+            self.slots.acquire()
+            tasks = []
+            with self.lock:
+                for job in batch:
+                    self.pending[job['id']] = job
+                    tasks.append((job['id'], job['path'], self.parameterSet, self.outputDirectory))
+            self.pool.apply_async(segmentBatch, (tasks,), callback = self.finishBatch)
+
+    def finishBatch(self, results):
+        """finishBatch(list results)"""
+        # Runs on the Pool Result Thread (Errors Must Not Escape or the Slot is Lost)
+        now = time.time()
+        try:
+            for jobId, error, seconds in results:
+                with self.lock:
+                    job = self.pending.pop(jobId)
+                    self.latencies.append(now - job['enqueued'])
+                    self.serviceTimes.append(seconds)
+                    if (error is None):
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                if (error is not None):
+                    sys.stderr.write('job ' + str(jobId) + ' failed: ' + job['path'] + ' ' + error + '\n')
+                if (job['source'] == 'spool'):
+                    try:
+                        self.retireSpoolFile(job['path'], error is None)
+                    except (IOError, OSError) as retireError:
+                        sys.stderr.write('job ' + str(jobId) + ' not retired: ' + job['path'] + ' ' + repr(retireError) + '\n')
+        finally:
+            self.slots.release()
+
+    def retireSpoolFile(self, path, success):
+        """retireSpoolFile(str path, bool success)"""
+        spoolDirectory = P.dirname(P.dirname(path))
+        directory = P.join(spoolDirectory, 'done' if success else 'failed')
+        if (not P.isdir(directory)):
+            os.makedirs(directory)
+        os.rename(path, P.join(directory, P.basename(path)))
+
+    def watchSpool(self, spoolDirectory, interval = 0.2):
+        """watchSpool(str spoolDirectory[, float interval = 0.2])"""
+        self.startThread(self.pollSpool, spoolDirectory, interval)
+
+    def pollSpool(self, spoolDirectory, interval):
+        """pollSpool(str spoolDirectory, float interval)"""
+        claimedDirectory = P.join(spoolDirectory, 'claimed')
+        if (not P.isdir(claimedDirectory)):
+            os.makedirs(claimedDirectory)
+
+        # Resubmit Files Claimed Before a Restart
+        for path in sorted(glob.glob(P.join(claimedDirectory, '*.png'))):
+            self.submit(path, 'spool')
+
+        # Claim New Files (Unclaimed Files Wait in the Spool While the Queue is Full)
+        while (not self.stopEvent.is_set()):
+            for path in sorted(glob.glob(P.join(spoolDirectory, '*.png'))):
+                if (self.stopEvent.is_set()):
+                    break
+                claimedPath = P.join(claimedDirectory, P.basename(path))
+                os.rename(path, claimedPath)
+                try:
+                    self.submit(claimedPath, 'spool')
+                except Queue.Full:
+                    break
+            self.stopEvent.wait(interval)
+
+    def listenSocket(self, socketPath):
+        """listenSocket(str socketPath)"""
+        if (P.exists(socketPath)):
+            os.remove(socketPath)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(socketPath)
+        server.listen(8)
+        server.settimeout(0.5)
+        self.startThread(self.acceptConnections, server, socketPath)
+
+    def acceptConnections(self, server, socketPath):
+        """acceptConnections(socket server, str socketPath)"""
+        try:
+            while (not self.stopEvent.is_set()):
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    continue
+                connection.settimeout(None)
+                thread = threading.Thread(target = self.serveConnection, args = (connection,))
+                thread.daemon = True
+                thread.start()
+        finally:
+            server.close()
+            os.remove(socketPath)
+
+    def serveConnection(self, connection):
+        """serveConnection(socket connection)"""
+        stream = connection.makefile('rw')
+        try:
+            for line in stream:
+                path = line.strip()
+                if (not path):
+                    continue
+                if (not P.isfile(path)):
+                    stream.write('error missing ' + path + '\n')
+                else:
+                    try:
+                        stream.write('queued ' + str(self.submit(P.abspath(path), 'socket')) + '\n')
+                    except Queue.Full:
+                        stream.write('busy ' + path + '\n')
+                stream.flush()
+        finally:
+            stream.close()
+            connection.close()
+
+    def getMetrics(self):
+        """dict getMetrics()"""
+        with self.lock:
+            latencies    = list(self.latencies)
+            serviceTimes = list(self.serviceTimes)
+            metrics = {}
+            metrics['queueDepth']    = self.queue.qsize()
+            metrics['maxQueueDepth'] = self.maxQueueDepth
+            metrics['inFlight']      = len(self.pending)
+            metrics['submitted']     = self.submitted
+            metrics['completed']     = self.completed
+            metrics['failed']        = self.failed
+        metrics['uptime'] = time.time() - self.startTime
+        metrics['throughput'] = (metrics['completed'] + metrics['failed']) / max(metrics['uptime'], 1e-9)
+        if (latencies):
+            metrics['latencyMedian'] = float(N.median(latencies))
+            metrics['latencyP90']    = float(N.percentile(latencies, 90))
+            metrics['serviceMedian'] = float(N.median(serviceTimes))
+        return metrics
+
+    def isIdle(self):
+        """bool isIdle()"""
+        with self.lock:
+            return self.queue.empty() and not self.pending and self.submitted == self.completed + self.failed
+
+    def stop(self):
+        """stop()"""
+
+        # Drain Queue and Stop Input Threads
+        self.stopEvent.set()
+        for thread in self.threads:
+            thread.join()
+
+        # Wait for In-Flight Batches
+        for _ in xrange(self.workers):
+            self.slots.acquire()
+        self.pool.close()
+        self.pool.join()
+
+def initializeWorker():
+    N.random.seed()
+    serviceState['racer'] = acr.AntColonyRacer()
+    serviceState['imageHandler'] = ih.ImageHandler()
+
+def saveAtomic(imageHandler, matrix, path):
+    temporaryPath = P.join(P.dirname(path), '.' + str(os.getpid()) + '.' + P.basename(path))
+    imageHandler.saveImage(matrix, temporaryPath)
+    os.rename(temporaryPath, path)
+
+def segmentBatch(tasks):
+    """list segmentBatch(list tasks)"""
+    antColonyRacer = serviceState['racer']
+    imageHandler   = serviceState['imageHandler']
+    results = []
+    for jobId, path, parameterSet, outputDirectory in tasks:
+        start = time.time()
+        try:
+            imageMatrix = imageHandler.getGrayscaleMatrix(path)
+            traceMatrix = antColonyRacer.run(imageMatrix, parameterSet)
+            layerMatrix = imageHandler.selectLayers(traceMatrix, parameterSet.get('layerCount', 8))
+            name = P.splitext(P.basename(path))[0]
+            saveAtomic(imageHandler, traceMatrix, P.join(outputDirectory, name + ' trace.png'))
+            saveAtomic(imageHandler, layerMatrix, P.join(outputDirectory, name + ' layers.png'))
+            results.append((jobId, None, time.time() - start))
+        except Exception as error:
+            results.append((jobId, repr(error), time.time() - start))
+    return results
+
+def produceImages(sourcePaths, spoolDirectory, count, interval = 0.):
+    """produceImages(list sourcePaths, str spoolDirectory, int count[, float interval = 0.])"""
+    if (not P.isdir(spoolDirectory)):
+        os.makedirs(spoolDirectory)
+    for i in xrange(count):
+        name = 'scan' + str(i).zfill(5) + '.png'
+        temporaryPath = P.join(spoolDirectory, '.' + name + '.tmp')
+        shutil.copyfile(sourcePaths[i % len(sourcePaths)], temporaryPath)
+        os.rename(temporaryPath, P.join(spoolDirectory, name))
+        time.sleep(interval)
+
+def serve(arguments):
+    parameterSet = {}
+    parameterSet['cycleCount'] = arguments.cycles
+    parameterSet['rho'] = arguments.rho
+    parameterSet['psi'] = arguments.psi
+    service = SegmentationService(arguments.output, parameterSet, arguments.workers, arguments.queue_size,
+                                  arguments.batch_size)
+    service.start()
+    if (arguments.spool is not None):
+        service.watchSpool(arguments.spool, arguments.interval)
+    if (arguments.socket is not None):
+        service.listenSocket(arguments.socket)
+    lastReport = time.time()
+    try:
+        while (True):
+            time.sleep(0.1)
+            metrics = service.getMetrics()
+            if (time.time() - lastReport >= arguments.metrics_interval):
+                print json.dumps(metrics, sort_keys = True)
+                sys.stdout.flush()
+                lastReport = time.time()
+            if (arguments.limit is not None and metrics['completed'] + metrics['failed'] >= arguments.limit
+                and service.isIdle()):
+                break
+    except KeyboardInterrupt:
+        pass
+    service.stop()
+    print json.dumps(service.getMetrics(), sort_keys = True)
+
+if (__name__ == '__main__'):
+    parser = argparse.ArgumentParser(description = 'Streaming ant colony segmentation service')
+    commands = parser.add_subparsers(dest = 'command')
+    serveParser = commands.add_parser('serve')
+    serveParser.add_argument('--spool', default = None)
+    serveParser.add_argument('--socket', default = None)
+    serveParser.add_argument('--output', default = P.join('output', 'service'))
+    serveParser.add_argument('--workers', type = int, default = mp.cpu_count())
+    serveParser.add_argument('--queue-size', type = int, default = 16)
+    serveParser.add_argument('--batch-size', type = int, default = 1)
+    serveParser.add_argument('--interval', type = float, default = 0.2)
+    serveParser.add_argument('--metrics-interval', type = float, default = 5.)
+    serveParser.add_argument('--limit', type = int, default = None)
+    serveParser.add_argument('--cycles', type = int, default = 10)
+    serveParser.add_argument('--rho', type = float, default = 1.0)
+    serveParser.add_argument('--psi', type = float, default = 0.1)
+    produceParser = commands.add_parser('produce')
+    produceParser.add_argument('spool')
+    produceParser.add_argument('--sources', nargs = '+', default = sorted(glob.glob(P.join('images', '*.png'))))
+    produceParser.add_argument('--count', type = int, default = 10)
+    produceParser.add_argument('--interval', type = float, default = 0.)
+    arguments = parser.parse_args()
+    if (arguments.command == 'serve'):
+        serve(arguments)
+    else:
+        produceImages(arguments.sources, arguments.spool, arguments.count, arguments.interval)
\ No newline at end of file
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+import os
+import csv
+import json
+import time
+import argparse
+import itertools
+import numpy as N
+import os.path as P
+import multiprocessing as mp
+
+import ImageHandler as ih
+import AntColonyRacer as acr
+import HeuristicCache as hc
+import TestTools as tt
+
+sweepParameters = ['rho', 'psi', 'cycleCount', 'antCount',
+                   'bilateralIterations', 'bilateralDiameter', 'bilateralSigma', 'medianWidth']
+
+sweepState = {}
+
+def getBaseParameters():
+    parameterSet = {}
+    parameterSet['cycleCount'] = 10
+    parameterSet['rho'] = 1.0
+    parameterSet['psi'] = 0.1
+    return parameterSet
+
+def buildGrid(space):
+    names = sorted(space.keys())
+    configurations = []
+    for values in itertools.product(*[space[name] for name in names]):
+        parameterSet = getBaseParameters()
+        parameterSet.update(dict(zip(names, values)))
+        configurations.append(parameterSet)
+    return configurations
+
+def sampleSpace(space, count, seed = 0):
+    randomState = N.random.RandomState(seed)
+    names = sorted(space.keys())
+    configurations = []
+    for _ in xrange(count):
+        parameterSet = getBaseParameters()
+        for name in names:
+            parameterSet[name] = space[name][randomState.randint(len(space[name]))]
+        configurations.append(parameterSet)
+    return configurations
+
+def initializeWorker(cacheDirectory):
+    N.random.seed()
+    sweepState['racer'] = acr.AntColonyRacer(hc.HeuristicCache(cacheDirectory))
+    sweepState['images'] = {}
+
+def loadImage(subject, imageNumber):
+    images = sweepState['images']
+    if ((subject, imageNumber) not in images):
+        imageMatrix = tt.loadImage(subject, imageNumber)
+        truthLayers = tt.getGroundTruth(subject, imageNumber)
+        truthMatrix = tt.getTruthMatrix(truthLayers, imageMatrix.shape)
+        images[(subject, imageNumber)] = (imageMatrix, truthLayers, truthMatrix)
+    return images[(subject, imageNumber)]
+
+def getMinImages(configurationCount, imageCount, eta):
+    # One Rung per Halving Needed to Leave a Single Survivor
+    rungs = 0
+    while (configurationCount > 1):
+        configurationCount = max(1, configurationCount // eta)
+        rungs += 1
+    return max(1, imageCount // eta ** rungs)
+
+def evaluateTask(task):
+    configurationIndex, parameterSet, subject, imageNumber = task
+    imageMatrix, truthLayers, truthMatrix = loadImage(subject, imageNumber)
+    imageHandler = ih.ImageHandler()
+    start = time.time()
+    traceMatrix = sweepState['racer'].run(imageMatrix, parameterSet)
+    end = time.time()
+    layerMatrix = imageHandler.selectLayers(traceMatrix, 8)
+    accuracy = tt.getAccuracy(layerMatrix, truthMatrix)
+    coverage = tt.getCoverage(layerMatrix, truthLayers)
+    coverage = coverage[0: 8] / coverage[-1]
+    statistics = sweepState['racer'].heuristicCache.getStatistics()
+    return configurationIndex, accuracy['acc'], N.mean(coverage), end - start, os.getpid(), statistics
+
+def runSweep(configurations, selection, jobs = 1, eta = 3, minImages = None, seed = 0, cacheDirectory = None):
+
+    # Fixed Image Order Shared by Every Rung
+    order = N.random.RandomState(seed).permutation(len(selection))
+    selection = [selection[i] for i in order]
+    if (minImages is None):
+        minImages = getMinImages(len(configurations), len(selection), eta)
+
+    # Result Accumulators
+    results = []
+    for i in xrange(len(configurations)):
+        results.append({ 'acc': [], 'cov': [], 'time': [], 'rung': 0 })
+    workerStatistics = {}
+
+    # Worker Pool (Image Store Ingested Before Forking)
+    if (tt.useImageStore):
+        tt.getImageStore()
+    if (jobs > 1):
+        pool = mp.Pool(jobs, initializeWorker, (cacheDirectory,))
+        mapper = pool.imap_unordered
+    else:
+        initializeWorker(cacheDirectory)
+        pool = None
+        mapper = itertools.imap
+
+    # Successive Halving Rungs
+    try:
+        survivors = range(len(configurations))
+        imageCount = min(minImages, len(selection))
+        rung = 0
+        while (True):
+            tasks = []
+            for i in survivors:
+                evaluated = len(results[i]['acc'])
+                for subject, imageNumber in selection[evaluated: imageCount]:
+                    tasks.append((i, configurations[i], subject, imageNumber))
+            for i, acc, cov, seconds, worker, statistics in mapper(evaluateTask, tasks):
+                results[i]['acc'].append(acc)
+                results[i]['cov'].append(cov)
+                results[i]['time'].append(seconds)
+                workerStatistics[worker] = statistics
+            for i in survivors:
+                results[i]['rung'] = rung
+            if (imageCount >= len(selection) or len(survivors) <= 1):
+                break
+            survivors = sorted(survivors, key = lambda i: -N.mean(results[i]['acc']))
+            survivors = survivors[0: max(1, len(survivors) // eta)]
+            imageCount = min(imageCount * eta, len(selection))
+            rung += 1
+    finally:
+        if (pool is not None):
+            pool.close()
+            pool.join()
+
+    # Cache Counters Summed Over Workers (Latest Report per Worker)
+    cacheStatistics = { 'hits': 0, 'diskHits': 0, 'misses': 0, 'entries': 0 }
+    for statistics in workerStatistics.values():
+        for name in cacheStatistics:
+            cacheStatistics[name] += statistics[name]
+    cacheStatistics['workers'] = len(workerStatistics)
+
+    # Return Results
+    return results, cacheStatistics
+
+def saveStatistics(cacheStatistics, path):
+    data = open(path, 'w')
+    json.dump(cacheStatistics, data, indent = 1, sort_keys = True)
+    data.close()
+
+def saveResults(configurations, results, path):
+    data = open(path, 'wb')
+    writer = csv.writer(data)
+    writer.writerow(['configuration'] + sweepParameters + ['rung', 'images', 'accuracy', 'coverage', 'time'])
+    antColonyRacer = acr.AntColonyRacer()
+    for i in xrange(len(configurations)):
+        parameterSet = antColonyRacer.getFilterParameters(configurations[i])
+        parameterSet.update(configurations[i])
+        row = [i]
+        for name in sweepParameters:
+            row.append(parameterSet.get(name, ''))
+        row.append(results[i]['rung'])
+        row.append(len(results[i]['acc']))
+        row.append(N.mean(results[i]['acc']))
+        row.append(N.mean(results[i]['cov']))
+        row.append(N.mean(results[i]['time']))
+        writer.writerow(row)
+    data.close()
+
+if (__name__ == '__main__'):
+    parser = argparse.ArgumentParser(description = 'Ant colony parameter sweep')
+    parser.add_argument('--rho', type = float, nargs = '+', default = [1.0])
+    parser.add_argument('--psi', type = float, nargs = '+', default = [0.1])
+    parser.add_argument('--cycles', type = int, nargs = '+', default = [10])
+    parser.add_argument('--ants', type = int, nargs = '+', default = None)
+    parser.add_argument('--bilateral-iterations', type = int, nargs = '+', default = None)
+    parser.add_argument('--bilateral-diameter', type = int, nargs = '+', default = None)
+    parser.add_argument('--bilateral-sigma', type = float, nargs = '+', default = None)
+    parser.add_argument('--median-width', type = int, nargs = '+', default = None)
+    parser.add_argument('--search', choices = ['grid', 'random'], default = 'grid')
+    parser.add_argument('--samples', type = int, default = 20)
+    parser.add_argument('--subjects', type = int, nargs = '+', default = range(1, 11))
+    parser.add_argument('--images', type = int, nargs = '+', default = range(1, 11))
+    parser.add_argument('--jobs', type = int, default = 1)
+    parser.add_argument('--eta', type = int, default = 3)
+    parser.add_argument('--min-images', type = int, default = None)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--cache-directory', default = None)
+    parser.add_argument('--output', default = P.join('output', 'sweep.csv'))
+    arguments = parser.parse_args()
+
+    space = {}
+    space['rho'] = arguments.rho
+    space['psi'] = arguments.psi
+    space['cycleCount'] = arguments.cycles
+    if (arguments.ants is not None):
+        space['antCount'] = arguments.ants
+    if (arguments.bilateral_iterations is not None):
+        space['bilateralIterations'] = arguments.bilateral_iterations
+    if (arguments.bilateral_diameter is not None):
+        space['bilateralDiameter'] = arguments.bilateral_diameter
+    if (arguments.bilateral_sigma is not None):
+        space['bilateralSigma'] = arguments.bilateral_sigma
+    if (arguments.median_width is not None):
+        space['medianWidth'] = arguments.median_width
+
+    if (arguments.search == 'grid'):
+        configurations = buildGrid(space)
+    else:
+        configurations = sampleSpace(space, arguments.samples, arguments.seed)
+
+    selection = [(subject, imageNumber) for subject in arguments.subjects for imageNumber in arguments.images]
+    results, cacheStatistics = runSweep(configurations, selection, arguments.jobs, arguments.eta, arguments.min_images,
+                                        arguments.seed, arguments.cache_directory)
+    saveResults(configurations, results, arguments.output)
+    saveStatistics(cacheStatistics, P.splitext(arguments.output)[0] + '_cache.json')
+    print 'heuristic cache', 'hits', cacheStatistics['hits'], 'disk', cacheStatistics['diskHits'], \
+          'misses', cacheStatistics['misses']
\ No newline at end of file
@@ -1,38 +1,51 @@
 # -*- coding: utf-8 -*-
 
+import os
+import sys
+import atexit
+import json
 import time
+import argparse
 import numpy as N
 import os.path as P
+import multiprocessing as mp
 
 import ImageHandler as ih
 import DataHandler as dh
 import AntColonyRacer as acr
 import MathTools as mt
+import GroundTruthStore as gts
+import MetricTools as mtr
+import ProfileTools as pt
+import OutputSink as osk
+import ImageStore as ist
 
-def antColony(subject, imageNumber):
+groundTruthStore = gts.GroundTruthStore()
+metricTools = mtr.MetricTools()
+outputSink  = None
+outputMode  = 'png'
+imageStore  = None
+useImageStore = True
+parameterOverrides = {}
+layerExtraction = 'select'
 
-    # Toolboxes
-    imageHandler = ih.ImageHandler()
-    dataHandler  = dh.DataHandler()
-    mathTools    = mt.MathTools()
+def antColony(subject, imageNumber):
 
     # Ant Colony Racer
     antColonyRacer = acr.AntColonyRacer()
 
-    # Construct Image Name
-    imageName = str(imageNumber)
-    if (imageNumber < 10):
-        imageName = '0' + imageName
-    imageName = 'Subject' + str(subject) + '_' + imageName
-
     # Load Image Matrix
-    imageMatrix = imageHandler.getGrayscaleMatrix(P.join('images', imageName + '.png'))
+    imageMatrix = loadImage(subject, imageNumber)
 
     # Fill Parameters
     parameterSet = {}
     parameterSet['cycleCount'] = 10
     parameterSet['rho'] = 1.0
     parameterSet['psi'] = 0.1
+    parameterSet.update(parameterOverrides)
+
+    # Reset Stage Timers
+    pt.profiler.reset()
 
     # Start Timer
     start = time.time()
@@ -43,8 +56,69 @@ def antColony(subject, imageNumber):
     # End Timer
     end = time.time()
 
+    # Ordered Layer Paths
+    layerMatrix = None
+    if (layerExtraction == 'path'):
+        layers = antColonyRacer.extractLayers(traceMatrix, parameterSet)
+        layerMatrix = getTruthMatrix(layers, imageMatrix.shape)
+
+    # Evaluate and Save
+    stats = evaluateTrace(subject, imageNumber, imageMatrix, traceMatrix, end - start, layerMatrix)
+
+    # Cycles Used per Pass
+    stats['cycles'] = [report['cycles'] for report in antColonyRacer.passReports]
+
+    # Stage Breakdown
+    if (pt.profiler.enabled):
+        stats['profile'] = pt.profiler.report()
+
+    # Return Statistics
+    return stats
+
+def antColonyVolume(subject, imageNumbers = range(1, 11)):
+
+    # Ant Colony Racer
+    antColonyRacer = acr.AntColonyRacer()
+
+    # Load Volume Matrix
+    volumeMatrix = loadVolume(subject, imageNumbers)
+
+    # Fill Parameters
+    parameterSet = {}
+    parameterSet['cycleCount'] = 10
+    parameterSet['warmCycleCount'] = 3
+    parameterSet['rho'] = 1.0
+    parameterSet['psi'] = 0.1
+
+    # Start Timer
+    start = time.time()
+
+    # Algorithm Run
+    traceVolume = antColonyRacer.runVolume(volumeMatrix, parameterSet)
+
+    # End Timer
+    end = time.time()
+
+    # Evaluate and Save Each Slice
+    sliceTime = (end - start) / len(imageNumbers)
+    statsList = []
+    for index, imageNumber in enumerate(imageNumbers):
+        statsList.append(evaluateTrace(subject, imageNumber, volumeMatrix[index], traceVolume[index], sliceTime))
+
+    # Return Statistics
+    return statsList
+
+def evaluateTrace(subject, imageNumber, imageMatrix, traceMatrix, seconds, layerMatrix = None):
+
+    # Toolboxes
+    imageHandler = ih.ImageHandler()
+
+    # Construct Image Name
+    imageName = getImageName(subject, imageNumber)
+
     # Select Layers
-    layerMatrix = imageHandler.selectLayers(traceMatrix, 8)
+    if (layerMatrix is None):
+        layerMatrix = imageHandler.selectLayers(traceMatrix, 8)
 
     # Evaluate
     truthLayers = getGroundTruth(subject, imageNumber)
@@ -52,16 +126,18 @@ def antColony(subject, imageNumber):
     accuracy    = getAccuracy(layerMatrix, truthMatrix)
     coverage    = getCoverage(layerMatrix, truthLayers)
 
-    # Save Images
-    imageHandler.saveImage(imageMatrix, P.join('output', imageName + ' 0.png'))
-    imageHandler.saveImage(traceMatrix, P.join('output', imageName + ' 1.png'))
-    imageHandler.saveImage(layerMatrix, P.join('output', imageName + ' 2.png'))
-    imageHandler.saveImage(truthMatrix, P.join('output', imageName + ' 3.png'))
+    # Queue Images
+    sink  = getOutputSink()
+    group = 'Subject' + str(subject)
+    sink.write(group, imageName + ' 0', imageMatrix)
+    sink.write(group, imageName + ' 1', traceMatrix)
+    sink.write(group, imageName + ' 2', layerMatrix)
+    sink.write(group, imageName + ' 3', truthMatrix)
 
     # Save Statistics
     stats = {}
     stats['name'] = imageName
-    stats['time'] = int(end - start)
+    stats['time'] = int(seconds)
     stats['tp'] = accuracy['tp']
     stats['fp'] = accuracy['fp']
     stats['fn'] = accuracy['fn']
@@ -71,69 +147,63 @@ def antColony(subject, imageNumber):
     # Return Statistics
     return stats
 
+def getImageStore():
+    global imageStore
+    if (imageStore is None):
+        imageStore = ist.ImageStore('images').open()
+    return imageStore
+
+def loadImage(subject, imageNumber):
+    if (useImageStore):
+        return getImageStore().getGrayscaleMatrix(subject, imageNumber)
+    imageHandler = ih.ImageHandler()
+    return imageHandler.getGrayscaleMatrix(P.join('images', getImageName(subject, imageNumber) + '.png'))
+
+def loadVolume(subject, imageNumbers):
+    if (useImageStore):
+        return getImageStore().getGrayscaleVolume(subject, imageNumbers)
+    return N.array([loadImage(subject, imageNumber) for imageNumber in imageNumbers])
+
+def getOutputSink():
+    global outputSink
+    if (outputSink is None):
+        outputSink = osk.OutputSink('output', outputMode)
+        atexit.register(closeOutputSink)
+    return outputSink
+
+def closeOutputSink():
+    global outputSink
+    if (outputSink is not None):
+        sink = outputSink
+        outputSink = None
+        sink.close()
+
 def getGroundTruth(subject, imageNumber):
-    dataHandler = dh.DataHandler()
-    reference = dataHandler.textToMatrix(P.join('data', 'Subject' + str(subject) + '_1.txt')).T
-    width  = reference.shape[1]
-    result = N.zeros((8, width))
-    for l in xrange(1, 9):
-        matrix = dataHandler.textToMatrix(P.join('data', 'Subject' + str(subject) + '_' + str(l) + '.txt')).T
-        result[l - 1, :] = matrix[imageNumber - 1, :]
-    return result
+    return groundTruthStore.getLayers(subject, imageNumber)
 
 def getTruthMatrix(truthLayers, matrixShape):
-    truthMatrix = N.zeros(matrixShape)
-    layers = truthLayers.shape[0]
-    width  = truthLayers.shape[1]
-    for i in xrange(layers):
-        for j in xrange(width):
-            row = int(truthLayers[i, j])
-            truthMatrix[row, j] = 1
-    return truthMatrix
+    return metricTools.getTruthMatrix(truthLayers, matrixShape)
 
 def getAccuracy(layerMatrix, truthMatrix):
-    tp = 0
-    fp = 0
-    fn = 0
-    height = truthMatrix.shape[0]
-    width  = truthMatrix.shape[1]
-    for i in xrange(height):
-        for j in xrange(width):
-            truth = truthMatrix[i, j]
-            layer = layerMatrix[i, j]
-            if (truth == 1 and layer == 1):
-                tp += 1
-            elif (truth == 1 and layer == 0):
-                fn += 1
-            elif (truth == 0 and layer == 1):
-                fp += 1
-    acc = float(tp) / float(tp + fp + fn)
-    return { 'tp': tp, 'fp': fp, 'fn': fn, 'acc': acc }
+    return metricTools.getAccuracy(layerMatrix, truthMatrix)
 
 def getCoverage(layerMatrix, truthLayers):
-    layers = truthLayers.shape[0]
-    width  = truthLayers.shape[1]
-    result = N.zeros(9).T
-    result[8] = width
-    for i in xrange(layers):
-        for j in xrange(width):
-            row = int(truthLayers[i, j])
-            result[i] += int(layerMatrix[row, j] == 1)
-    return result
+    return metricTools.getCoverage(layerMatrix, truthLayers)
 
-if (__name__ == '__main__'):
-    dataHandler = dh.DataHandler()
-    experimentData = []
+def getImageName(subject, imageNumber):
+    imageName = str(imageNumber)
+    if (imageNumber < 10):
+        imageName = '0' + imageName
+    return 'Subject' + str(subject) + '_' + imageName
+
+def summarizeStats(experimentData):
     totalCoverage  = N.zeros(8).astype(float)
     totalAccuracy  = 0.
     dataPoints     = 0.
-    for subject in xrange(1, 11):
-        for imageNumber in xrange(1, 11):
-            stats = antColony(subject, imageNumber)
-            totalAccuracy += stats['acc']
-            totalCoverage += stats['coverage']
-            dataPoints += 1.
-            experimentData.append(stats)
+    for stats in experimentData:
+        totalAccuracy += stats['acc']
+        totalCoverage += stats['coverage']
+        dataPoints += 1.
     accMean = totalAccuracy / dataPoints
     covMean = totalCoverage / dataPoints
     accStdev = 0
@@ -148,7 +218,145 @@ if (__name__ == '__main__'):
     lastData['covMean']  = covMean
     lastData['accStdev'] = accStdev
     lastData['covStdev'] = covStdev
-    experimentData.append(lastData)
-    dataHandler.saveReport(experimentData, P.join('output', 'report.txt'))
-            
-            
\ No newline at end of file
+    return lastData
+
+def getStatsPath(statsDirectory, subject, imageNumber):
+    return P.join(statsDirectory, getImageName(subject, imageNumber) + '.json')
+
+def saveStats(stats, path):
+    record = dict(stats)
+    record['coverage'] = list(stats['coverage'])
+    record['configuration'] = getConfiguration()
+    temporaryPath = path + '.tmp'
+    data = open(temporaryPath, 'w')
+    json.dump(record, data)
+    data.close()
+    os.rename(temporaryPath, path)
+
+def getConfiguration():
+    # Settings that Change Results (Resumed Stats Must Match Them)
+    configuration = {}
+    configuration['parameterOverrides'] = parameterOverrides
+    configuration['layerExtraction']    = layerExtraction
+    return json.loads(json.dumps(configuration))
+
+def isResumable(path):
+    if (not P.isfile(path)):
+        return False
+    data = open(path)
+    try:
+        record = json.load(data)
+    except ValueError:
+        return False
+    finally:
+        data.close()
+    return record.get('configuration') == getConfiguration()
+
+def loadStats(path):
+    data = open(path)
+    stats = json.load(data)
+    data.close()
+    stats['name'] = str(stats['name'])
+    stats.pop('configuration', None)
+    stats['coverage'] = N.array(stats['coverage'])
+    return stats
+
+def configureProfiler(enabled, logPath = None):
+    pt.profiler.enabled = enabled
+    pt.profiler.logPath = logPath
+
+def initializeWorker(profile = False, storeImages = True):
+    global outputSink, useImageStore
+    useImageStore = storeImages
+    N.random.seed()
+    configureProfiler(profile)
+    # Worker Images are Returned to the Parent Sink
+    outputSink = osk.OutputSink('output', workers = 0)
+
+def evaluateImage(task):
+    subject, imageNumber = task
+    stats = antColony(subject, imageNumber)
+    return subject, imageNumber, stats, getOutputSink().drain()
+
+def streamBatch(selection, jobs = 1, resume = False, statsDirectory = P.join('output', 'stats')):
+    if (not P.isdir(statsDirectory)):
+        os.makedirs(statsDirectory)
+    pending = []
+    for subject, imageNumber in selection:
+        path = getStatsPath(statsDirectory, subject, imageNumber)
+        if (resume and isResumable(path)):
+            yield subject, imageNumber, loadStats(path)
+        else:
+            pending.append((subject, imageNumber))
+    # Statistics Mark an Image Done Only Once Its Outputs are on Disk
+    sink = getOutputSink()
+    if (jobs > 1):
+        # Ingest Before Forking so Workers Share the Mapped Pages
+        if (useImageStore):
+            getImageStore()
+        pool = mp.Pool(jobs, initializeWorker, (pt.profiler.enabled, useImageStore))
+        try:
+            for subject, imageNumber, stats, entries in pool.imap_unordered(evaluateImage, pending):
+                for entry in entries:
+                    sink.write(*entry)
+                sink.whenWritten(saveStats, stats, getStatsPath(statsDirectory, subject, imageNumber))
+                yield subject, imageNumber, stats
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for task in pending:
+            subject, imageNumber, stats, _ = evaluateImage(task)
+            sink.whenWritten(saveStats, stats, getStatsPath(statsDirectory, subject, imageNumber))
+            yield subject, imageNumber, stats
+    sink.flush()
+
+def evaluateBatch(selection, jobs = 1, resume = False, reportPath = P.join('output', 'report.txt')):
+    dataHandler = dh.DataHandler()
+    results = {}
+    for subject, imageNumber, stats in streamBatch(selection, jobs, resume):
+        results[(subject, imageNumber)] = stats
+        print stats['name'], 'acc', dataHandler.format(stats['acc']), 'time', stats['time'], 'cycles', stats.get('cycles')
+        if ('profile' in stats):
+            record = dict(stats['profile'])
+            record['name'] = stats['name']
+            pt.profiler.log(record)
+        sys.stdout.flush()
+    closeOutputSink()
+    experimentData = [results[task] for task in selection]
+    experimentData.append(summarizeStats(experimentData))
+    dataHandler.saveReport(experimentData, reportPath)
+    return experimentData
+
+if (__name__ == '__main__'):
+    parser = argparse.ArgumentParser(description = 'Ant colony layer segmentation evaluation')
+    parser.add_argument('--jobs', type = int, default = 1)
+    parser.add_argument('--subjects', type = int, nargs = '+', default = range(1, 11))
+    parser.add_argument('--images', type = int, nargs = '+', default = range(1, 11))
+    parser.add_argument('--resume', action = 'store_true')
+    parser.add_argument('--profile', action = 'store_true')
+    parser.add_argument('--profile-log', default = None)
+    parser.add_argument('--output-mode', choices = ['png', 'npz'], default = 'png')
+    parser.add_argument('--no-image-store', action = 'store_true')
+    parser.add_argument('--tolerance', type = float, default = None)
+    parser.add_argument('--convergence', choices = ['selection', 'trace'], default = 'selection')
+    parser.add_argument('--deadline', type = float, default = None,
+                        help = 'seconds per colony pass; an image runs two passes, so it can take about twice '
+                               'the deadline plus filtering')
+    parser.add_argument('--extraction', choices = ['select', 'path'], default = 'select',
+                        help = 'path is experimental: ordered layer search, currently slightly less accurate than select')
+    parser.add_argument('--strip-width', type = int, default = None)
+    arguments = parser.parse_args()
+    layerExtraction = arguments.extraction
+    if (arguments.tolerance is not None):
+        parameterOverrides['tolerance']   = arguments.tolerance
+        parameterOverrides['convergence'] = arguments.convergence
+    if (arguments.deadline is not None):
+        parameterOverrides['deadline'] = arguments.deadline
+    if (arguments.strip_width is not None):
+        parameterOverrides['stripWidth'] = arguments.strip_width
+    outputMode = arguments.output_mode
+    useImageStore = not arguments.no_image_store
+    configureProfiler(arguments.profile or arguments.profile_log is not None, arguments.profile_log)
+    selection = [(subject, imageNumber) for subject in arguments.subjects for imageNumber in arguments.images]
+    evaluateBatch(selection, arguments.jobs, arguments.resume)